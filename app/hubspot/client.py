@@ -1,6 +1,5 @@
 import requests
 import logging 
-import json
 import time
 import re
 from datetime import datetime
@@ -10,9 +9,22 @@ from dataclasses import dataclass
 
 from bs4 import BeautifulSoup as bs
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 
+class HubSpotServerError(Exception):
+    """HubSpot answered with a 5xx or 429 or didn't answer in time, so the request may succeed if retried later."""
+
+
 def CLEAN_TEXT(text):
     text = re.sub(r'[^\x00-\x7F]+', ' ', text)
     text = re.sub(r'\s+', ' ', text)
@@ -68,10 +80,21 @@ def FORMAT_CURRENCY(amount):
 
 class HubSpotClient: 
 
+    SUPPORTED_METHODS = frozenset(["GET", "POST", "PUT", "PATCH", "DELETE"])
+    # (connect, read) seconds, as for Graph calls, so a hung HubSpot connection can't hold a worker indefinitely
+    DEFAULT_TIMEOUT = (5, 30)
+
     def __init__(self, hs_secret_key):
         self.PORTAL_ID = "46658116"
         self.ACCESS_TOKEN = hs_secret_key
 
+        # Headers are set once on a shared session, which also keeps connections alive between calls
+        self.SESSION = requests.Session()
+        self.SESSION.headers.update({
+            "Authorization": f"Bearer {self.ACCESS_TOKEN}",
+            "Content-Type": "application/json",
+        })
+
         self.BASE_URL = "https://api.hubapi.com"
         self.EMAILS_PATH = f"{self.BASE_URL}/crm/v3/objects/emails"
         self.DEALS_PATH = f"{self.BASE_URL}/crm/v3/objects/deals"
@@ -158,12 +181,6 @@ class HubSpotClient:
             "engagement",
         }
 
-    def BUILD_HEADERS(self):
-        return {
-            "Authorization": f"Bearer {self.ACCESS_TOKEN}",
-            "Content-Type": "application/json",
-        }
-
     def BUILD_DEAL_CONTACTS_ASSOC_PATH(self, deal_id):
         return f"{self.BASE_URL}/crm/v4/objects/deals/{deal_id}/associations/contacts"
 
@@ -197,7 +214,7 @@ class HubSpotClient:
     def BUILD_URL_TO_WEBSITE_QUOTE(self, public_quote_id):
         return f"https://gohubsteel-46658116.hs-sites.com/{public_quote_id}"
     
-    def _make_request(self, url, method="GET", params=None, body=None):
+    def _make_request(self, url, method="GET", params=None, body=None, raise_server_errors=False):
         """
         Centralized method to make HTTP requests to the HubSpot API
         
@@ -206,6 +223,8 @@ class HubSpotClient:
             method (str, optional): HTTP method (GET, POST, PUT, PATCH, DELETE). Defaults to "GET".
             params (dict, optional): URL parameters. Defaults to None.
             body (dict, optional): Request body for POST/PUT/PATCH requests. Defaults to None.
+            raise_server_errors (bool, optional): Raise HubSpotServerError on a 5xx, a 429, a timeout or
+                a connection error instead of returning None, for callers that retry. Defaults to False.
             
         Returns:
             dict or None: JSON response if successful, None if error
@@ -213,31 +232,37 @@ class HubSpotClient:
         try:
             logger.info(f"Making {method} request to: {url}")
         
-            headers = self.BUILD_HEADERS()
             logger.info(f"Using Authorization: Bearer {self.ACCESS_TOKEN[:5]}...")
             
-            if method.upper() == "GET":
-                response = requests.get(url, headers=headers)
-            elif method.upper() == "POST":
-                response = requests.post(url, headers=headers, params=params, json=body)
-            elif method.upper() == "PUT":
-                response = requests.put(url, headers=headers, params=params, json=body)
-            elif method.upper() == "PATCH":
-                response = requests.patch(url, headers=headers, params=params, json=body)
-            elif method.upper() == "DELETE":
-                response = requests.delete(url, headers=headers, params=params)
-            else:
+            method = method.upper()
+            if method not in self.SUPPORTED_METHODS:
                 logger.error(f"Unsupported HTTP method: {method}")
                 return None
                 
+            if method == "GET":
+                # GET requests have always been sent without params or a body
+                response = self.SESSION.request(method, url, timeout=self.DEFAULT_TIMEOUT)
+            elif method == "DELETE":
+                response = self.SESSION.request(method, url, params=params, timeout=self.DEFAULT_TIMEOUT)
+            else:
+                data = _json_dumps(body) if body is not None else None
+                response = self.SESSION.request(method, url, params=params, data=data, timeout=self.DEFAULT_TIMEOUT)
+                
             response.raise_for_status()
 
             if response.content:
-                return response.json()
+                return _json_loads(response.content)
             return {}
             
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP Error {e.response.status_code}: {e.response.text}")
+            if raise_server_errors and (e.response.status_code >= 500 or e.response.status_code == 429):
+                raise HubSpotServerError(f"HubSpot returned {e.response.status_code}") from e
+            return None
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            logger.error(f"Request error: {e}")
+            if raise_server_errors:
+                raise HubSpotServerError(f"HubSpot request failed: {e}") from e
             return None
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error: {e}")
@@ -435,7 +460,7 @@ class HubSpotClient:
         
         return self._make_request(url, "POST", body=body)
     
-    def create_note_on_deal(self, deal_id, note_text):
+    def create_note_on_deal(self, deal_id, note_text, raise_server_errors=False, timestamp=None):
         body = {
             "associations": [
                 {
@@ -452,11 +477,30 @@ class HubSpotClient:
             ],
             "properties": {
                 "hs_note_body": note_text,
-                "hs_timestamp": int(time.time() * 1000),
+                "hs_timestamp": timestamp if timestamp is not None else int(time.time() * 1000),
             }
         }
 
-        return self._make_request(self.NOTES_PATH, "POST", body=body)
+        return self._make_request(self.NOTES_PATH, "POST", body=body, raise_server_errors=raise_server_errors)
+
+    def find_note_on_deal(self, deal_id, timestamp, raise_server_errors=False):
+        """Return the first note on the deal whose hs_timestamp is the given epoch milliseconds, or None"""
+        url = f"{self.NOTES_PATH}/search"
+        body = {
+            "filterGroups": [
+                {
+                    "filters": [
+                        {"propertyName": "associations.deal", "operator": "EQ", "value": str(deal_id)},
+                        {"propertyName": "hs_timestamp", "operator": "EQ", "value": str(timestamp)},
+                    ]
+                }
+            ],
+            "limit": 1,
+        }
+
+        response = self._make_request(url, "POST", body=body, raise_server_errors=raise_server_errors)
+        results = (response or {}).get("results") or []
+        return results[0] if results else None
     
     def update_deal(self, deal_id, properties):
         """Update properties of a deal"""
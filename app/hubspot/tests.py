@@ -1,3 +1,34 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+import pytest
+import requests
+
+from app.hubspot.client import HubSpotClient
+from app.hubspot.client import HubSpotServerError
+
+
+@pytest.fixture
+def hs_client():
+    client = HubSpotClient("secret")
+    client.SESSION = mock.Mock()
+    return client
+
+
+def test_requests_are_sent_with_a_timeout(hs_client):
+    hs_client.SESSION.request.return_value = mock.Mock(content=b'{"id": "9"}')
+
+    assert hs_client.create_note_on_deal("101", "call back") == {"id": "9"}
+    timeout = hs_client.SESSION.request.call_args.kwargs["timeout"]
+    assert timeout == HubSpotClient.DEFAULT_TIMEOUT
+
+
+@pytest.mark.parametrize(
+    "error",
+    [requests.exceptions.ReadTimeout(), requests.exceptions.ConnectionError()],
+)
+def test_timeouts_raise_for_callers_that_retry(hs_client, error):
+    hs_client.SESSION.request.side_effect = error
+
+    assert hs_client.create_note_on_deal("101", "call back") is None
+    with pytest.raises(HubSpotServerError):
+        hs_client.create_note_on_deal("101", "call back", raise_server_errors=True)
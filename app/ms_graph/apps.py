@@ -1,6 +1,12 @@
+import contextlib
+
 from django.apps import AppConfig
 
 
 class MsGraphConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.ms_graph'
+
+    def ready(self):
+        with contextlib.suppress(ImportError):
+            import app.ms_graph.signals  # noqa: F401
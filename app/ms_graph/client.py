@@ -1,13 +1,30 @@
 import os
+import csv
+import asyncio
+import time
 import logging
+import threading
 import requests
 import msal
 import urllib.parse
 import itsdangerous
-from typing import Dict, List, Union, Optional, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Union, Optional, Any, Tuple, Set
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from django.conf import settings
 
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 logging.basicConfig(
     level=logging.INFO, 
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -19,8 +36,87 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# App-only tokens shared by every client in the process: (tenant_id, client_id, scope) -> (token, expires_at)
+_TOKEN_CACHE: Dict[Tuple[str, str, str], Tuple[str, float]] = {}
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# Downloads land here; the folder is created the first time a client needs it
+_DOWNLOAD_DIR = os.path.join(os.getcwd(), "downloads")
+_download_dir_ready = False
+
+# File extensions recognised as Excel workbooks
+_WB_EXTS = (".xlsx", ".xlsm", ".xlsb", ".xls")
+
+# Doubles quotes so text can sit inside an Excel string literal
+_QUOTE_TRANS = str.maketrans({'"': '""'})
+
+# Graph accepts at most 20 sub-requests per $batch call
+_BATCH_LIMIT = 20
+
+# Workbook item metadata trimmed to the save timestamp, polled while waiting for Excel to save
+_LAST_SAVED_URL = "{base_url}/drives/{drive_id}/items/{item_id}?$select=lastModifiedDateTime"
+
+# Rows fetched per request when streaming a worksheet to CSV
+_CSV_WINDOW_ROWS = 500
+
+# Graph's simple upload endpoint rejects files above 4 MB; larger files go through an upload session
+_SIMPLE_UPLOAD_LIMIT = 4 * 1024 * 1024
+# Upload session fragments must be a multiple of 320 KiB
+_UPLOAD_CHUNK_SIZE = 32 * 320 * 1024
+
+
+def _compute_column_letter(n: int) -> str:
+    """Convert a column number to Excel column letter (A, B, C, ..., Z, AA, AB, ...)"""
+    column = ''
+    while n > 0:
+        n, remainder = divmod(n - 1, 26)
+        column = chr(65 + remainder) + column
+    return column
+
+
+def _column_number(column: str) -> int:
+    """Convert an Excel column letter to its 1-based column number (A -> 1, AA -> 27, ...)"""
+    number = 0
+    for char in column.upper():
+        number = number * 26 + ord(char) - 64
+    return number
+
+
+def _hyperlink_formula(url: str, text: Any) -> str:
+    """Build an Excel HYPERLINK formula with quotes escaped in both arguments"""
+    return f'=HYPERLINK("{url.translate(_QUOTE_TRANS)}", "{str(text).translate(_QUOTE_TRANS)}")'
+
+
+@lru_cache(maxsize=1024)
+def _quote_file_name(file_name: str) -> str:
+    """URL encode a file name for a drive path; the same names recur across calls"""
+    return urllib.parse.quote(file_name, safe="")
+
+
+# Every column letter Excel supports (A..XFD), indexed by column number - 1
+_MAX_COLUMNS = 16384
+_COLUMN_LETTERS = tuple(_compute_column_letter(i) for i in range(1, _MAX_COLUMNS + 1))
+
+
+class _GraphRetry(Retry):
+    """
+    Retry that never resends a POST Graph may already have applied.
+
+    POSTs here delete rows (range delete with shift, $batch of deletes), so a 5xx or read timeout
+    can follow a delete that went through. They are retried only on 429, which Graph returns
+    before doing any work, and on connect errors, which urllib3 retries for every method.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method and method.upper() == "POST":
+            return status_code == 429 and bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
+
 
 class MSGraphClient:
+    # (connect, read) seconds, so a stalled Graph call can't hold a worker indefinitely
+    DEFAULT_TIMEOUT = (5, 30)
+
     def __init__(self, customer: object):
         """
         Initialize the Microsoft Graph Workbook Client
@@ -30,6 +126,10 @@ class MSGraphClient:
             site_id (str, optional): The SharePoint site ID
             drive_id (str, optional): The drive ID
         """
+        # Kept so the token can be renewed once it expires
+        self._customer = customer
+        self._token_expires_at = 0.0
+        self._cached_headers: Optional[Dict[str, str]] = None
         self.access_token = self.get_msgraph_access_token(customer)
         self.site_id = customer.msgraph_site_id
         self.drive_id = customer.msgraph_drive_id
@@ -38,11 +138,70 @@ class MSGraphClient:
         self.sites_path = f"{self.base_url}/sites/{self.site_id}"
         self.drives_path = f"{self.base_url}/drives/{self.drive_id}"
         self.items_path = f"{self.sites_path}/drives/{self.drive_id}/items"
+
+        # Shared session so every call reuses pooled keep-alive connections
+        self._session = requests.Session()
+        retry = _GraphRetry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # POST is left out so read timeouts never resend it; _GraphRetry still retries its 429s
+            allowed_methods=frozenset(["GET", "PUT", "PATCH", "DELETE"]),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self._session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+
+        # Short-lived cache of usedRange responses, keyed by (workbook_item_id, worksheet_id, drive_id)
+        self.used_range_ttl = 5
+        self._used_range_cache: Dict[Tuple[str, str, str], Tuple[float, Dict]] = {}
+        # Guards the used range and header row caches, which worker threads (AsyncMSGraphClient,
+        # CSV prefetch, clients shared across requests) read and write concurrently
+        self._cache_lock = threading.Lock()
+
+        # ID column -> row number maps, keyed by (workbook_item_id, worksheet_id, drive_id, id_column):
+        # (built_at, workbook lastModifiedDateTime, index). Rows move when the sheet is edited in Excel,
+        # so an index is only served while the workbook's lastModifiedDateTime is unchanged; the TTL
+        # is just an upper bound on its age
+        self.row_index_ttl = 300
+        self._row_index_cache: Dict[Tuple[str, str, str, str], Tuple[float, Optional[str], Dict[str, int]]] = {}
+        self._row_index_lock = threading.Lock()
+
+        # File lookups by name: name -> item ID, and name -> (ETag, content)
+        self._file_id_cache: Dict[str, str] = {}
+        self._file_content_cache: Dict[str, Tuple[str, bytes]] = {}
+
+        # Header rows rarely change, so they are kept for longer: (fetched_at, columnIndex, headers)
+        self.header_row_ttl = 3600
+        self._header_row_cache: Dict[Tuple[str, str, str], Tuple[float, int, List]] = {}
+
+        # Worksheets already confirmed by get_worksheet_last_saved_timestamp: (workbook_item_id, worksheet_name, drive_id)
+        self._known_worksheets: Set[Tuple[str, str, str]] = set()
         
         # Create download folder if it doesn't exist
         self._check_download_folder()
+
+    def close(self) -> None:
+        """Release the pooled connections held by the session"""
+        self._session.close()
+
+    def __enter__(self) -> "MSGraphClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
     
     def get_msgraph_access_token(self, customer):
+        key = (customer.msgraph_tenant_id, customer.msgraph_client_id, customer.msgraph_scopes)
+        
+        # Reuse a token another client already acquired while it has more than a minute left
+        with _TOKEN_CACHE_LOCK:
+            cached = _TOKEN_CACHE.get(key)
+        if cached and cached[1] - 60 > time.monotonic():
+            self._token_expires_at = cached[1]
+            self._cached_headers = None
+            return cached[0]
+            
         try:
             MSGRAPH_AUTHORITY = f"https://login.microsoftonline.com/{customer.msgraph_tenant_id}"
             app = msal.ConfidentialClientApplication(customer.msgraph_client_id, authority=MSGRAPH_AUTHORITY, client_credential=customer.msgraph_client_secret)
@@ -50,6 +209,10 @@ class MSGraphClient:
 
             if "access_token" in token_response:
                 logging.info("Access token obtained successfully.")
+                self._token_expires_at = time.monotonic() + int(token_response.get("expires_in", 0))
+                self._cached_headers = None
+                with _TOKEN_CACHE_LOCK:
+                    _TOKEN_CACHE[key] = (token_response["access_token"], self._token_expires_at)
                 return token_response["access_token"]
             else:
                 logging.error("Failed to obtain access token: %s", token_response.get("error_description", "Unknown error"))
@@ -59,12 +222,22 @@ class MSGraphClient:
             return None
     
     def _headers(self) -> Dict[str, str]:
-        """Build the headers for API requests"""
-        return {"Authorization": f"Bearer {self.access_token}"}
+        """
+        Get the headers for API requests, renewing the access token shortly before it expires.
+        
+        The same dict is returned until then, so callers must copy it before adding headers.
+        """
+        if time.monotonic() >= self._token_expires_at - 30:
+            self.access_token = self.get_msgraph_access_token(self._customer)
+            self._cached_headers = None
+            
+        if self._cached_headers is None:
+            self._cached_headers = {"Authorization": f"Bearer {self.access_token}"}
+        return self._cached_headers
     
     def _safe_file_name(self, file_name: str) -> str:
         """URL encode a file name safely"""
-        return urllib.parse.quote(file_name, safe="")
+        return _quote_file_name(file_name)
     
     def _local_path(self, download_file_name: str) -> str:
         """Generate a safe local file path"""
@@ -73,42 +246,45 @@ class MSGraphClient:
         if not safe_download_file_name.endswith('.xlsx'):
             safe_download_file_name += '.xlsx'
 
-        return os.path.join(os.getcwd(), "downloads", safe_download_file_name)
+        return os.path.join(_DOWNLOAD_DIR, safe_download_file_name)
     
     def _check_download_folder(self) -> None:
-        """Ensure download folder exists"""
-        download_folder = os.path.join(os.getcwd(), "downloads")
-        if not os.path.exists(download_folder):
-            os.makedirs(download_folder)
+        """Ensure download folder exists (checked once per process)"""
+        global _download_dir_ready
+        if not _download_dir_ready:
+            os.makedirs(_DOWNLOAD_DIR, exist_ok=True)
+            _download_dir_ready = True
     
     def _column_letter(self, n: int) -> str:
         """Convert a column number to Excel column letter (A, B, C, ..., Z, AA, AB, ...)"""
-        column = ''
-        while n > 0:
-            n, remainder = divmod(n - 1, 26)
-            column = chr(65 + remainder) + column
-        return column
+        if 0 < n <= _MAX_COLUMNS:
+            return _COLUMN_LETTERS[n - 1]
+        return _compute_column_letter(n)
     
     def _make_request(self, method: str, url: str, headers: Dict = None, json_data: Dict = None, 
                      data: Any = None, params: Dict = None) -> Dict:
         """Make an HTTP request and handle errors"""
         if headers is None:
             headers = self._headers()
+
+        if json_data is not None:
+            data = _json_dumps(json_data)
+            headers = {**headers, "Content-Type": "application/json"}
         
         try:
-            response = requests.request(
+            response = self._session.request(
                 method=method, 
                 url=url, 
                 headers=headers, 
-                json=json_data,
                 data=data,
-                params=params
+                params=params,
+                timeout=self.DEFAULT_TIMEOUT,
             )
             response.raise_for_status()
             
             if response.content:
                 try:
-                    return response.json()
+                    return _json_loads(response.content)
                 except ValueError:
                     return {"content": response.content}
             return {}
@@ -125,6 +301,35 @@ class MSGraphClient:
             logger.exception(f"Request error: {str(e)}")
             raise
     
+    def _relative_url(self, url: str) -> str:
+        """Strip the Graph base URL so the path can be used inside a $batch request"""
+        return url[len(self.base_url):] if url.startswith(self.base_url) else url
+
+    def batch(self, requests_list: List[Dict]) -> Dict[str, Dict]:
+        """
+        Send sub-requests through Graph's $batch endpoint, 20 per HTTP call.
+        
+        Args:
+            requests_list (List[Dict]): Sub-requests, each with an "id", "method" and a "url" relative to the API version
+            
+        Returns:
+            Dict[str, Dict]: Sub-responses keyed by request id
+        """
+        responses = {}
+        url = f"{self.base_url}/$batch"
+
+        for start in range(0, len(requests_list), _BATCH_LIMIT):
+            chunk = requests_list[start:start + _BATCH_LIMIT]
+            result = self._make_request("POST", url, json_data={"requests": chunk})
+
+            for response in result.get("responses", []):
+                responses[response.get("id")] = response
+                if response.get("status", 500) >= 400:
+                    logger.error(f"Batch request {response.get('id')} failed with status {response.get('status')}")
+
+        logger.info(f"Sent {len(requests_list)} batched requests")
+        return responses
+
     def get_sites(self) -> List[Dict]:
         """
         Get all available SharePoint sites.
@@ -392,11 +597,7 @@ class MSGraphClient:
         else:
             items = self.get_drive_items(drive_id)
         
-        workbooks = []
-        for item in items:
-            name = item.get("name", "")
-            if name.endswith((".xlsx", ".xlsm", ".xlsb", ".xls")):
-                workbooks.append(item)
+        workbooks = [item for item in items if item.get("name", "").lower().endswith(_WB_EXTS)]
         
         if workbooks:
             logger.info(f"Found {len(workbooks)} workbooks.")
@@ -418,7 +619,7 @@ class MSGraphClient:
             Optional[Dict]: The workbook object if found, None otherwise
         """
         # Add .xlsx extension if not already present
-        if not any(workbook_name.endswith(ext) for ext in [".xlsx", ".xlsm", ".xlsb", ".xls"]):
+        if not workbook_name.lower().endswith(_WB_EXTS):
             workbook_name += ".xlsx"
         
         if folder_path:
@@ -427,7 +628,50 @@ class MSGraphClient:
             search_path = workbook_name
             
         return self.get_item(search_path, drive_id)
-    
+
+    def get_workbook_with_sheets(self, workbook_name: str, folder_path: str = "", drive_id: str = None) -> Tuple[Optional[Dict], List[Dict]]:
+        """
+        Find a workbook by name and list its worksheets in a single request.
+
+        Args:
+            workbook_name (str): The name of the workbook to find
+            folder_path (str, optional): Path to the folder. Default is root.
+            drive_id (str, optional): The drive ID. Uses instance drive_id if not provided.
+
+        Returns:
+            Tuple[Optional[Dict], List[Dict]]: The workbook item (None if not found) and its worksheets
+        """
+        if not drive_id and not self.drive_id:
+            logger.error("Drive ID is required")
+            return None, []
+
+        # Add .xlsx extension if not already present
+        if not workbook_name.lower().endswith(_WB_EXTS):
+            workbook_name += ".xlsx"
+
+        if folder_path:
+            search_path = f"{folder_path}/{workbook_name}"
+        else:
+            search_path = workbook_name
+
+        drive_id_to_use = drive_id or self.drive_id
+        safe_path = self._safe_file_name(search_path)
+        url = f"{self.base_url}/drives/{drive_id_to_use}/root:/{safe_path}:/?$expand=workbook/worksheets($select=id,name,position)"
+
+        try:
+            result = self._make_request("GET", url)
+        except requests.exceptions.HTTPError:
+            logger.warning(f"Workbook '{search_path}' not found.")
+            return None, []
+
+        if "id" not in result:
+            logger.warning(f"Workbook '{search_path}' not found.")
+            return None, []
+
+        worksheets = result.pop("workbook", {}).get("worksheets", [])
+        logger.info(f"Workbook '{search_path}' found with ID: {result['id']} ({len(worksheets)} worksheets)")
+        return result, worksheets
+
     def get_worksheets(self, workbook_item_id: str, drive_id: str = None) -> List[Dict]:
         """
         Get all worksheets in a workbook.
@@ -557,6 +801,51 @@ class MSGraphClient:
             
         return result
     
+    def _get_used_range_summary(self, workbook_item_id: str, worksheet_id: str, drive_id: str = None) -> Optional[Dict]:
+        """Get only the position and size of a worksheet's used range, without its values"""
+        if not drive_id and not self.drive_id:
+            logger.error("Drive ID is required")
+            return None
+
+        drive_id_to_use = drive_id or self.drive_id
+        url = f"{self.base_url}/drives/{drive_id_to_use}/items/{workbook_item_id}/workbook/worksheets/{worksheet_id}/usedRange(valuesOnly=true)?$select=rowIndex,columnIndex,rowCount,columnCount"
+
+        try:
+            result = self._make_request("GET", url)
+        except requests.exceptions.RequestException:
+            logger.warning("Failed to retrieve used range summary, falling back to full used range")
+            return None
+
+        if "rowCount" not in result:
+            logger.warning("Used range summary missing row count, falling back to full used range")
+            return None
+
+        return result
+
+    def _get_used_range_cached(self, workbook_item_id: str, worksheet_id: str, drive_id: str = None) -> Dict:
+        """Return the used range of a worksheet, reusing a response fetched within used_range_ttl seconds"""
+        key = (workbook_item_id, worksheet_id, drive_id or self.drive_id)
+        with self._cache_lock:
+            cached = self._used_range_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self.used_range_ttl:
+            return cached[1]
+
+        result = self.get_used_range(workbook_item_id, worksheet_id, drive_id)
+        if "values" in result:
+            with self._cache_lock:
+                self._used_range_cache[key] = (time.monotonic(), result)
+        return result
+
+    def _invalidate_used_range(self, workbook_item_id: str) -> None:
+        """Drop cached used ranges for every worksheet of a workbook after a write"""
+        # Worksheets are addressed by ID in some calls and by name in others, so clear the whole workbook
+        with self._cache_lock:
+            for key in [key for key in self._used_range_cache if key[0] == workbook_item_id]:
+                self._used_range_cache.pop(key, None)
+        with self._row_index_lock:
+            for key in [key for key in self._row_index_cache if key[0] == workbook_item_id]:
+                self._row_index_cache.pop(key, None)
+
     def get_worksheet_headers(self, workbook_item_id: str, worksheet_id: str, header_row: int = 1, drive_id: str = None) -> List[str]:
         """
         Get the column headers from a worksheet.
@@ -571,7 +860,7 @@ class MSGraphClient:
             List[str]: The header values
         """
         # First get used range to determine the width
-        used_range = self.get_used_range(workbook_item_id, worksheet_id, drive_id)
+        used_range = self._get_used_range_cached(workbook_item_id, worksheet_id, drive_id)
         
         if not used_range or "values" not in used_range:
             logger.warning("Could not retrieve used range")
@@ -590,7 +879,7 @@ class MSGraphClient:
             return []
             
         # Get just the header row
-        header_values = used_range["values"][header_row_index]
+        header_values = list(used_range["values"][header_row_index])
         
         # Filter out None or empty values at the end
         while header_values and (header_values[-1] is None or header_values[-1] == ""):
@@ -666,70 +955,113 @@ class MSGraphClient:
         Returns:
             Optional[int]: The 1-based row index if found, None otherwise
         """
-        # If column is a header name, get column letter
+        # If column is a header name, get column letter from the cached header row
         if len(column) > 1 and not column.isalpha():
-            column_letter = self.get_column_letter_by_header(workbook_item_id, worksheet_id, column, drive_id=drive_id)
+            column_letter = self._get_cached_header_letter(workbook_item_id, worksheet_id, column, drive_id)
             if not column_letter:
                 logger.warning(f"Column header '{column}' not found")
                 return None
             column = column_letter
         
-        # Get used range to determine data boundaries
-        used_range = self.get_used_range(workbook_item_id, worksheet_id, drive_id)
-        
-        if not used_range or "values" not in used_range or not used_range["values"]:
-            logger.warning("No data found in worksheet")
-            return None
-            
-        # Parse address to get starting row and max row
-        address = used_range.get("address", "")
-        if not address:
-            logger.warning("Could not determine used range address")
-            return None
-            
-        # Address format is typically like "Sheet1!A1:G100"
-        # We need to extract the row range
-        parts = address.split("!")
-        if len(parts) < 2:
-            logger.warning(f"Unexpected address format: {address}")
-            return None
-            
-        cell_range = parts[1]
-        range_parts = cell_range.split(":")
-        if len(range_parts) < 2:
-            logger.warning(f"Unexpected range format: {cell_range}")
-            return None
-            
-        # Extract the start row (skip sheet name and column letters)
-        start_row_str = ''.join(filter(str.isdigit, range_parts[0]))
-        start_row = int(start_row_str) if start_row_str else 1
-        
-        # Get all values in the specified column
-        column_range = f"{column}{start_row}:{column}{start_row + len(used_range['values']) - 1}"
-        column_data = self.get_range(workbook_item_id, worksheet_id, column_range, drive_id)
+        # Read only the used part of the one column being searched
+        column_data = self._get_column_used_range(workbook_item_id, worksheet_id, column, drive_id)
         
-        if not column_data or "values" not in column_data:
+        if not column_data or not column_data.get("values"):
             logger.warning(f"Failed to retrieve data from column {column}")
             return None
             
+        start_row = column_data.get("rowIndex", 0) + 1
+        target = str(search_value) if case_sensitive else str(search_value).lower()
+        
         # Search for value in column
         for i, cell in enumerate(column_data["values"]):
             cell_value = cell[0] if cell else None
             
             if cell_value is not None:
-                if case_sensitive:
-                    if str(cell_value) == str(search_value):
-                        row_index = start_row + i
-                        logger.info(f"Found value '{search_value}' at row {row_index}")
-                        return row_index
-                else:
-                    if str(cell_value).lower() == str(search_value).lower():
-                        row_index = start_row + i
-                        logger.info(f"Found value '{search_value}' at row {row_index}")
-                        return row_index
+                cell_text = str(cell_value) if case_sensitive else str(cell_value).lower()
+                if cell_text == target:
+                    row_index = start_row + i
+                    logger.info(f"Found value '{search_value}' at row {row_index}")
+                    return row_index
                         
         logger.warning(f"Value '{search_value}' not found in column {column}")
         return None
+
+    def _get_column_used_range(self, workbook_item_id: str, worksheet_id: str, column: str, drive_id: str = None) -> Dict:
+        """Get the values and starting row of the used part of a single column"""
+        if not drive_id and not self.drive_id:
+            logger.error("Drive ID is required")
+            return {}
+
+        drive_id_to_use = drive_id or self.drive_id
+        url = f"{self.base_url}/drives/{drive_id_to_use}/items/{workbook_item_id}/workbook/worksheets/{worksheet_id}/range(address='{column}:{column}')/usedRange(valuesOnly=true)?$select=values,rowIndex"
+
+        return self._make_request("GET", url)
+
+    def _get_cached_header_letter(self, workbook_item_id: str, worksheet_id: str, header_name: str,
+                                  drive_id: str = None) -> Optional[str]:
+        """Resolve a header name in row 1 to its column letter, reading the header row at most once per header_row_ttl"""
+        key = (workbook_item_id, worksheet_id, drive_id or self.drive_id)
+        with self._cache_lock:
+            cached = self._header_row_cache.get(key)
+
+        if not cached or time.monotonic() - cached[0] >= self.header_row_ttl:
+            if not drive_id and not self.drive_id:
+                logger.error("Drive ID is required")
+                return None
+
+            drive_id_to_use = drive_id or self.drive_id
+            url = f"{self.base_url}/drives/{drive_id_to_use}/items/{workbook_item_id}/workbook/worksheets/{worksheet_id}/range(address='1:1')/usedRange(valuesOnly=true)?$select=values,columnIndex"
+            result = self._make_request("GET", url)
+            headers = result.get("values", [[]])[0] if result.get("values") else []
+            cached = (time.monotonic(), result.get("columnIndex", 0), headers)
+            with self._cache_lock:
+                self._header_row_cache[key] = cached
+
+        _, column_index, headers = cached
+        try:
+            return self._column_letter(column_index + headers.index(header_name) + 1)
+        except ValueError:
+            return None
+    
+    def build_row_index(self, workbook_item_id: str, worksheet_id: str, id_column: str,
+                        drive_id: str = None) -> Dict[str, int]:
+        """
+        Map every value in an ID column to its row number from a single read of that column.
+        
+        Args:
+            workbook_item_id (str): The ID of the workbook item
+            worksheet_id (str): The ID or name of the worksheet
+            id_column (str): The column letter or header name containing IDs
+            drive_id (str, optional): The drive ID. Uses instance drive_id if not provided.
+            
+        Returns:
+            Dict[str, int]: Lower-cased ID values mapped to their 1-based row index (first occurrence wins)
+        """
+        # If column is a header name, get column letter from the cached header row
+        column = id_column
+        if len(column) > 1 and not column.isalpha():
+            column = self._get_cached_header_letter(workbook_item_id, worksheet_id, id_column, drive_id)
+            if not column:
+                logger.warning(f"Column header '{id_column}' not found")
+                return {}
+        
+        # Read only the used part of the ID column, as find_row_by_value does
+        column_data = self._get_column_used_range(workbook_item_id, worksheet_id, column, drive_id)
+        
+        if not column_data or not column_data.get("values"):
+            logger.warning(f"Failed to retrieve data from column {column}")
+            return {}
+            
+        start_row = column_data.get("rowIndex", 0) + 1
+        row_index = {}
+        for i, cell in enumerate(column_data["values"]):
+            cell_value = cell[0] if cell else None
+            if cell_value not in (None, ""):
+                row_index.setdefault(str(cell_value).lower(), start_row + i)
+                
+        logger.info(f"Indexed {len(row_index)} values from column {id_column}")
+        return row_index
     
     def update_cell(self, workbook_item_id: str, worksheet_id: str, cell_address: str, 
                   value: Any, drive_id: str = None) -> bool:
@@ -759,10 +1091,11 @@ class MSGraphClient:
         
         try:
             self._make_request("PATCH", url, json_data=body)
+            self._invalidate_used_range(workbook_item_id)
             logger.info(f"Updated cell {cell_address} with value: {value}")
             return True
-        except:
-            logger.error(f"Failed to update cell {cell_address}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to update cell {cell_address} (status {getattr(e.response, 'status_code', 'Unknown')})")
             return False
     
     def update_range(self, workbook_item_id: str, worksheet_id: str, range_address: str, 
@@ -793,12 +1126,47 @@ class MSGraphClient:
         
         try:
             self._make_request("PATCH", url, json_data=body)
+            self._invalidate_used_range(workbook_item_id)
             logger.info(f"Updated range {range_address}")
             return True
-        except:
-            logger.error(f"Failed to update range {range_address}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to update range {range_address} (status {getattr(e.response, 'status_code', 'Unknown')})")
             return False
             
+    def update_ranges_batch(self, ops: List[Tuple[str, List[List[Any]]]]) -> List[Dict]:
+        """
+        Update several ranges with batched PATCH requests instead of one request per range.
+        
+        Args:
+            ops (List[Tuple[str, List[List[Any]]]]): (range URL relative to the API version, 2D values) pairs
+            
+        Returns:
+            List[Dict]: The batch sub-response for each operation, in the order given
+        """
+        requests_list = [
+            {
+                "id": str(i),
+                "method": "PATCH",
+                "url": rel_url,
+                "headers": {"Content-Type": "application/json"},
+                "body": {"values": values},
+            }
+            for i, (rel_url, values) in enumerate(ops)
+        ]
+
+        try:
+            responses = self.batch(requests_list)
+        except requests.exceptions.RequestException:
+            logger.error(f"Failed to send batch update of {len(ops)} ranges")
+            return [{"id": str(i), "status": 500} for i in range(len(ops))]
+        finally:
+            with self._cache_lock:
+                self._used_range_cache.clear()
+            with self._row_index_lock:
+                self._row_index_cache.clear()
+
+        return [responses.get(str(i), {"id": str(i), "status": 500}) for i in range(len(ops))]
+
     def append_row(self, workbook_item_id: str, worksheet_id: str, values: List[Any], drive_id: str = None) -> bool:
         """
         Append a row to the end of a worksheet's data.
@@ -812,14 +1180,20 @@ class MSGraphClient:
         Returns:
             bool: True if successful, False otherwise
         """
-        # First find the last row with data
-        used_range = self.get_used_range(workbook_item_id, worksheet_id, drive_id)
+        # First find the last row with data, asking Graph for the row count only
+        summary = self._get_used_range_summary(workbook_item_id, worksheet_id, drive_id)
         
-        if not used_range or "values" not in used_range or not used_range["values"]:
-            # If sheet is empty, start at row 1
-            next_row = 1
+        if summary:
+            # rowIndex is 0-based, so this is the row after the last used row
+            next_row = summary["rowIndex"] + summary["rowCount"] + 1
         else:
-            next_row = len(used_range["values"]) + 1  # Add to the row after the last used row
+            used_range = self._get_used_range_cached(workbook_item_id, worksheet_id, drive_id)
+            
+            if not used_range or "values" not in used_range or not used_range["values"]:
+                # If sheet is empty, start at row 1
+                next_row = 1
+            else:
+                next_row = len(used_range["values"]) + 1  # Add to the row after the last used row
             
         # Determine how many columns we need
         num_columns = len(values)
@@ -843,7 +1217,11 @@ class MSGraphClient:
         Returns:
             int: The 1-based index of the last row with data
         """
-        used_range = self.get_used_range(workbook_item_id, worksheet_id, drive_id)
+        summary = self._get_used_range_summary(workbook_item_id, worksheet_id, drive_id)
+        if summary:
+            return summary["rowIndex"] + summary["rowCount"]
+
+        used_range = self._get_used_range_cached(workbook_item_id, worksheet_id, drive_id)
         
         if not used_range or "values" not in used_range or not used_range["values"]:
             return 0
@@ -862,13 +1240,19 @@ class MSGraphClient:
         Returns:
             Tuple[int, int]: A tuple of (rows, columns) representing the dimensions
         """
-        used_range = self.get_used_range(workbook_item_id, worksheet_id, drive_id)
+        summary = self._get_used_range_summary(workbook_item_id, worksheet_id, drive_id)
+        if summary:
+            rows, cols = summary["rowCount"], summary["columnCount"]
+            logger.info(f"Worksheet dimensions: {rows} rows x {cols} columns")
+            return (rows, cols)
+
+        used_range = self._get_used_range_cached(workbook_item_id, worksheet_id, drive_id)
         
         if not used_range or "values" not in used_range or not used_range["values"]:
             return (0, 0)
             
         rows = len(used_range["values"])
-        cols = max(len(row) for row in used_range["values"]) if rows > 0 else 0
+        cols = max(map(len, used_range["values"]), default=0)
             
         logger.info(f"Worksheet dimensions: {rows} rows x {cols} columns")
         return (rows, cols)
@@ -885,31 +1269,30 @@ class MSGraphClient:
         Returns:
             Optional[str]: The local file path if successful, None otherwise
         """
-        workbook_item = self.get_workbook_by_name(workbook_name, drive_id=drive_id)
-        
-        if not workbook_item:
-            logger.warning(f"Workbook '{workbook_name}' not found.")
-            return None
-            
         if not drive_id and not self.drive_id:
             logger.error("Drive ID is required")
             return None
             
         drive_id_to_use = drive_id or self.drive_id
-        item_id = workbook_item["id"]
         
-        url = f"{self.base_url}/drives/{drive_id_to_use}/items/{item_id}/content"
+        # Address the content by path, which saves looking up the item ID first
+        file_name = workbook_name if workbook_name.lower().endswith(_WB_EXTS) else f"{workbook_name}.xlsx"
+        url = f"{self.base_url}/drives/{drive_id_to_use}/root:/{self._safe_file_name(file_name)}:/content"
         
-        try:
-            response = requests.get(url, headers=self._headers())
-            response.raise_for_status()
+        if not local_path:
+            self._check_download_folder()
+            local_path = self._local_path(workbook_name)
             
-            if not local_path:
-                self._check_download_folder()
-                local_path = self._local_path(workbook_name)
+        try:
+            with self._session.get(url, headers=self._headers(), stream=True, timeout=self.DEFAULT_TIMEOUT) as response:
+                if response.status_code == 404:
+                    logger.warning(f"Workbook '{workbook_name}' not found.")
+                    return None
+                response.raise_for_status()
                 
-            with open(local_path, 'wb') as file:
-                file.write(response.content)
+                with open(local_path, 'wb') as file:
+                    for chunk in response.iter_content(chunk_size=1 << 20):
+                        file.write(chunk)
                 
             logger.info(f"Downloaded workbook to {local_path}")
             return local_path
@@ -946,25 +1329,72 @@ class MSGraphClient:
             upload_name = os.path.basename(local_path)
             
         if folder_path:
-            url = f"{self.base_url}/drives/{drive_id_to_use}/root:/{self._safe_file_name(folder_path)}/{self._safe_file_name(upload_name)}:/content"
+            item_url = f"{self.base_url}/drives/{drive_id_to_use}/root:/{self._safe_file_name(folder_path)}/{self._safe_file_name(upload_name)}"
         else:
-            url = f"{self.base_url}/drives/{drive_id_to_use}/root:/{self._safe_file_name(upload_name)}:/content"
+            item_url = f"{self.base_url}/drives/{drive_id_to_use}/root:/{self._safe_file_name(upload_name)}"
+        url = f"{item_url}:/content"
             
-        headers = self._headers()
-        headers["Content-Type"] = "application/octet-stream"
+        headers = {**self._headers(), "Content-Type": "application/octet-stream"}
+        
+        # The uploaded file replaces whatever was cached under this name
+        self._forget_file(f"{folder_path}/{upload_name}" if folder_path else upload_name)
         
         try:
+            file_size = os.path.getsize(local_path)
+            if file_size > _SIMPLE_UPLOAD_LIMIT:
+                result = self._upload_large_workbook(local_path, item_url)
+                logger.info(f"Uploaded workbook as {upload_name} using an upload session")
+                return result
+
+            headers["Content-Length"] = str(file_size)
             with open(local_path, 'rb') as file:
-                response = requests.put(url, headers=headers, data=file)
+                response = self._session.put(url, headers=headers, data=file, timeout=self.DEFAULT_TIMEOUT)
                 response.raise_for_status()
                 
-            result = response.json()
+            result = _json_loads(response.content)
             logger.info(f"Uploaded workbook as {upload_name}")
             return result
             
         except Exception as e:
             logger.error(f"Error uploading workbook: {str(e)}")
             return None
+
+    def _upload_large_workbook(self, local_path: str, item_url: str) -> Dict:
+        """
+        Upload a workbook through a Graph upload session, one fragment at a time.
+        
+        Args:
+            local_path (str): The local file path
+            item_url (str): The drive path URL of the target item (without the trailing ':/content')
+            
+        Returns:
+            Dict: The created item
+        """
+        upload_session = self._make_request(
+            "POST",
+            f"{item_url}:/createUploadSession",
+            json_data={"item": {"@microsoft.graph.conflictBehavior": "replace"}},
+        )
+        upload_url = upload_session["uploadUrl"]
+        total_size = os.path.getsize(local_path)
+
+        # Graph requires fragments to arrive in order, so they are sent sequentially.
+        # The upload URL is pre-authenticated and must not carry the Authorization header.
+        with open(local_path, 'rb') as file:
+            start = 0
+            while start < total_size:
+                chunk = file.read(_UPLOAD_CHUNK_SIZE)
+                end = start + len(chunk) - 1
+                response = self._session.put(
+                    upload_url,
+                    data=chunk,
+                    headers={"Content-Range": f"bytes {start}-{end}/{total_size}"},
+                    timeout=self.DEFAULT_TIMEOUT,
+                )
+                response.raise_for_status()
+                start = end + 1
+
+        return _json_loads(response.content)
     
     def find_row_by_id(self, workbook_item_id: str, worksheet_id: str, id_column: str, 
                      id_value: Any, drive_id: str = None) -> Optional[int]:
@@ -981,7 +1411,32 @@ class MSGraphClient:
         Returns:
             Optional[int]: The 1-based row index if found, None otherwise
         """
-        return self.find_row_by_value(workbook_item_id, worksheet_id, id_column, id_value, drive_id=drive_id)
+        key = (workbook_item_id, worksheet_id, drive_id or self.drive_id, id_column)
+        with self._row_index_lock:
+            cached = self._row_index_cache.get(key)
+            
+        # Repeated lookups (e.g. one per deal in a webhook burst) share one index of the ID column.
+        # The workbook's lastModifiedDateTime is one small metadata read, so it is checked on every
+        # lookup: a sort or an inserted/deleted row in Excel changes it and forces a rebuild
+        try:
+            last_modified = self.get_worksheet_last_saved_timestamp(workbook_item_id, drive_id=drive_id)
+        except requests.exceptions.RequestException:
+            last_modified = None
+            
+        if (cached and last_modified and cached[1] == last_modified
+                and time.monotonic() - cached[0] < self.row_index_ttl):
+            row_index = cached[2]
+        else:
+            # The timestamp is read before the index, so an edit made while building it shows up next time
+            row_index = self.build_row_index(workbook_item_id, worksheet_id, id_column, drive_id)
+            if last_modified:
+                with self._row_index_lock:
+                    self._row_index_cache[key] = (time.monotonic(), last_modified, row_index)
+                
+        row_number = row_index.get(str(id_value).lower())
+        if row_number is None:
+            logger.warning(f"Value '{id_value}' not found in column {id_column}")
+        return row_number
     
     def create_worksheet(self, workbook_item_id: str, name: str, drive_id: str = None) -> Optional[Dict]:
         """
@@ -1008,10 +1463,11 @@ class MSGraphClient:
         
         try:
             result = self._make_request("POST", url, json_data=body)
+            self._invalidate_used_range(workbook_item_id)
             logger.info(f"Created worksheet: {name}")
             return result
-        except:
-            logger.error(f"Failed to create worksheet: {name}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to create worksheet: {name} (status {getattr(e.response, 'status_code', 'Unknown')})")
             return None
 
     def format_cells_as_hyperlinks(self, workbook_item_id: str, worksheet_id: str, 
@@ -1035,13 +1491,8 @@ class MSGraphClient:
             logger.error("URLs and texts lists must be the same length")
             return False
             
-        # Create hyperlink formulas for each cell
-        formulas = []
-        for url, text in zip(urls, texts):
-            # Escape double quotes in text and URL
-            safe_text = text.replace('"', '""')
-            safe_url = url.replace('"', '""')
-            formulas.append([f'=HYPERLINK("{safe_url}", "{safe_text}")'])
+        # Create hyperlink formulas for each cell, escaping double quotes in text and URL
+        formulas = [[_hyperlink_formula(url, text)] for url, text in zip(urls, texts)]
             
         if not drive_id and not self.drive_id:
             logger.error("Drive ID is required")
@@ -1056,10 +1507,11 @@ class MSGraphClient:
         
         try:
             self._make_request("PATCH", url, json_data=body)
+            self._invalidate_used_range(workbook_item_id)
             logger.info(f"Added {len(formulas)} hyperlinks to range {range_address}")
             return True
-        except:
-            logger.error(f"Failed to add hyperlinks to range {range_address}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Failed to add hyperlinks to range {range_address} (status {getattr(e.response, 'status_code', 'Unknown')})")
             return False
     
     def export_worksheet_to_csv(self, workbook_item_id: str, worksheet_id: str, local_path: str, drive_id: str = None) -> bool:
@@ -1075,10 +1527,12 @@ class MSGraphClient:
         Returns:
             bool: True if successful, False otherwise
         """
-        import csv
+        summary = self._get_used_range_summary(workbook_item_id, worksheet_id, drive_id)
+        if summary:
+            return self._export_worksheet_to_csv_windowed(workbook_item_id, worksheet_id, local_path, summary, drive_id)
         
         # Get the used range of the worksheet
-        used_range = self.get_used_range(workbook_item_id, worksheet_id, drive_id)
+        used_range = self._get_used_range_cached(workbook_item_id, worksheet_id, drive_id)
         
         if not used_range or "values" not in used_range or not used_range["values"]:
             logger.warning("No data found in worksheet")
@@ -1088,9 +1542,8 @@ class MSGraphClient:
         
         try:
             with open(local_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                for row in values:
-                    writer.writerow(row)
+                writer = csv.writer(csvfile, quoting=csv.QUOTE_MINIMAL)
+                writer.writerows(values)
                     
             logger.info(f"Exported worksheet to {local_path}")
             return True
@@ -1099,17 +1552,102 @@ class MSGraphClient:
             logger.error(f"Error exporting to CSV: {str(e)}")
             return False
     
-    def get_file_content(self, file_name):
-        url = f"{self.DRIVES_PATH}/root:/{self.FILE_NAME_PARSE(file_name)}:/content"
-        return self._make_request(url, "GET")    
+    def _export_worksheet_to_csv_windowed(self, workbook_item_id: str, worksheet_id: str, local_path: str,
+                                          summary: Dict, drive_id: str = None) -> bool:
+        """Stream the used range to CSV a window of rows at a time, fetching the next window while writing"""
+        if not summary.get("rowCount"):
+            logger.warning("No data found in worksheet")
+            return False
+
+        first_row = summary["rowIndex"] + 1
+        last_row = summary["rowIndex"] + summary["rowCount"]
+        first_column = self._column_letter(summary["columnIndex"] + 1)
+        last_column = self._column_letter(summary["columnIndex"] + summary["columnCount"])
+
+        def fetch_window(start: int) -> List[List[Any]]:
+            end = min(start + _CSV_WINDOW_ROWS - 1, last_row)
+            window = self.get_range(workbook_item_id, worksheet_id, f"{first_column}{start}:{last_column}{end}", drive_id)
+            # get_range only logs a failed read; skipping the window would leave a truncated CSV
+            if "values" not in window:
+                raise ValueError(f"No values returned for rows {start}-{end}")
+            return window["values"]
+
+        window_starts = range(first_row, last_row + 1, _CSV_WINDOW_ROWS)
+
+        try:
+            with open(local_path, 'w', newline='', encoding='utf-8') as csvfile, \
+                    ThreadPoolExecutor(max_workers=1) as executor:
+                writer = csv.writer(csvfile, quoting=csv.QUOTE_MINIMAL)
+                pending = executor.submit(fetch_window, window_starts[0])
+
+                for next_start in window_starts[1:]:
+                    values = pending.result()
+                    pending = executor.submit(fetch_window, next_start)
+                    writer.writerows(values)
+
+                writer.writerows(pending.result())
+
+            logger.info(f"Exported worksheet to {local_path}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error exporting to CSV: {str(e)}")
+            return False
+
+    def get_file_content(self, file_name: str) -> bytes:
+        """
+        Get the raw content of a file, revalidating a previously downloaded copy by ETag.
+        
+        Args:
+            file_name (str): Path of the file relative to the drive root
+            
+        Returns:
+            bytes: The file content
+        """
+        url = f"{self.drives_path}/root:/{self._safe_file_name(file_name)}:/content"
+        headers = self._headers()
+        
+        cached = self._file_content_cache.get(file_name)
+        if cached:
+            headers = {**headers, "If-None-Match": cached[0]}
+            
+        response = self._session.get(url, headers=headers, timeout=self.DEFAULT_TIMEOUT)
+        if cached and response.status_code == 304:
+            logger.info(f"File '{file_name}' unchanged, using cached content")
+            return cached[1]
+            
+        response.raise_for_status()
+        
+        etag = response.headers.get("ETag")
+        if etag:
+            self._file_content_cache[file_name] = (etag, response.content)
+        return response.content
     
-    def get_file(self, file_name):
-        url = f"{self.DRIVES_PATH}/root:/{self.FILE_NAME_PARSE(file_name)}"
-        file_data = self._make_request(url, "GET")
+    def get_file(self, file_name: str) -> Optional[str]:
+        """
+        Get the item ID of a file, remembering it for the lifetime of the client.
+        
+        Args:
+            file_name (str): Path of the file relative to the drive root
+            
+        Returns:
+            Optional[str]: The item ID if found, None otherwise
+        """
+        if file_name in self._file_id_cache:
+            return self._file_id_cache[file_name]
+            
+        url = f"{self.drives_path}/root:/{self._safe_file_name(file_name)}"
+        file_data = self._make_request("GET", url)
         if "id" in file_data:
+            self._file_id_cache[file_name] = file_data["id"]
             return file_data["id"]
         else:
             return None
+
+    def _forget_file(self, file_name: str) -> None:
+        """Drop cached ID and content for a file"""
+        self._file_id_cache.pop(file_name, None)
+        self._file_content_cache.pop(file_name, None)
    
 
     def _generate_signed_url(self, row_number: int, secret_key: str):
@@ -1139,6 +1677,58 @@ class MSGraphClient:
             logger.error(f"Failed to verify signed row: {e}")
             return None
         
+    def _deal_row_values(self, data_to_add: Dict) -> List[Any]:
+        """Build the A:T row values for a parsed HubSpot deal"""
+        # Only wrap values in HYPERLINK when there is a URL to link to
+        amount_parse = (
+            _hyperlink_formula(data_to_add["quote_link"], data_to_add["deal_amount"])
+            if data_to_add.get("quote_link")
+            else data_to_add.get("deal_amount", "")
+        )
+        name_parse = (
+            _hyperlink_formula(data_to_add["deal_link"], data_to_add["name"])
+            if data_to_add.get("deal_link")
+            else data_to_add["name"]
+        )
+        plans_parse = (
+            _hyperlink_formula(data_to_add["plans_link"], "Link to Plans")
+            if data_to_add.get("plans_link")
+            else ""
+        )
+
+        # Generate signed URL
+        # signed_url = self._generate_signed_url(row_to_update, settings.SECRET_KEY)
+        # update_link_formula = f'=HYPERLINK("https://integration00.definit.com/excel/excel-note-to-hubspot/{row_to_update}/", "update")'
+        #update_link_formula = f'=HYPERLINK("https://integration00.definit.com/excel/excel-note-to-hubspot/" & ROW() & "/", "update")'
+
+        return [
+            data_to_add["deal_id"], 
+            name_parse, 
+            plans_parse,
+            data_to_add["city"],
+            data_to_add["state"],
+            data_to_add["associated_contact"],
+            data_to_add["associated_company"],
+            data_to_add["deal_stage"],
+            data_to_add["deal_owner"],
+            "",
+            amount_parse,
+            data_to_add["last_contacted"],
+            data_to_add["last_contacted_type"],
+            data_to_add["last_engagement"],
+            data_to_add["last_engagement_type"],
+            data_to_add["email"],
+            data_to_add["call"],
+            data_to_add["meeting"],
+            data_to_add["note"],
+            data_to_add["task"],
+        ]
+
+    def _deal_row_url(self, workbook_id: str, worksheet_name: str, row_to_update: int, last_row: int = None) -> str:
+        """Build the range URL for the A:T row of a deal, or A:T across rows row_to_update..last_row"""
+        target_range = f"A{row_to_update}:T{last_row or row_to_update}"
+        return f"{self.items_path}/{workbook_id}/workbook/worksheets/{worksheet_name}/range(address='{target_range}')"
+
     def parse_deal_to_excel_sheet(
             self,
             workbook_id, 
@@ -1149,47 +1739,13 @@ class MSGraphClient:
         logger.info(f"row being updated: {row_to_update}")
         
         try:
-            amount_parse = (
-                f'=HYPERLINK("{data_to_add["quote_link"]}", "{data_to_add["deal_amount"]}")'
-                if data_to_add.get("quote_link")
-                else data_to_add.get("deal_amount", "")
-            )
+            values = [self._deal_row_values(data_to_add)]
 
-            # Generate signed URL
-            # signed_url = self._generate_signed_url(row_to_update, settings.SECRET_KEY)
-            # update_link_formula = f'=HYPERLINK("https://integration00.definit.com/excel/excel-note-to-hubspot/{row_to_update}/", "update")'
-            #update_link_formula = f'=HYPERLINK("https://integration00.definit.com/excel/excel-note-to-hubspot/" & ROW() & "/", "update")'
-
-            values = [
-                [
-                    data_to_add["deal_id"], 
-                    f'=HYPERLINK("{data_to_add["deal_link"]}", "{data_to_add["name"]}")', 
-                    f'=HYPERLINK("{data_to_add["plans_link"]}", "Link to Plans")',
-                    data_to_add["city"],
-                    data_to_add["state"],
-                    data_to_add["associated_contact"],
-                    data_to_add["associated_company"],
-                    data_to_add["deal_stage"],
-                    data_to_add["deal_owner"],
-                    "",
-                    amount_parse,
-                    data_to_add["last_contacted"],
-                    data_to_add["last_contacted_type"],
-                    data_to_add["last_engagement"],
-                    data_to_add["last_engagement_type"],
-                    data_to_add["email"],
-                    data_to_add["call"],
-                    data_to_add["meeting"],
-                    data_to_add["note"],
-                    data_to_add["task"],
-                ]
-            ]
-
-            target_range = f"A{row_to_update}:T{row_to_update}"
-            url = f"{self.items_path}/{workbook_id}/workbook/worksheets/{worksheet_name}/range(address='{target_range}')"
+            url = self._deal_row_url(workbook_id, worksheet_name, row_to_update)
             body = {"values": values}
 
             result = self._make_request("PATCH", url, json_data=body)
+            self._invalidate_used_range(workbook_id)
             logger.info(f"updated excel sheet row.")
             return result
 
@@ -1197,6 +1753,58 @@ class MSGraphClient:
             logger.exception("Unexpected error while updating Excel sheet")
             return f"Unexpected error: {str(e)}"
 
+    def parse_deals_to_excel_sheet(self, workbook_id: str, worksheet_name: str,
+                                   deals: List[Tuple[Dict, int]]) -> List[bool]:
+        """
+        Write several parsed deals to their rows using batched requests.
+        
+        Deals on consecutive rows are written with a single range update. When several deals
+        target the same row only the last one is written; the others, and deals missing a
+        field, are skipped and reported as failed.
+        
+        Args:
+            workbook_id (str): The ID of the workbook
+            worksheet_name (str): The name of the worksheet
+            deals (List[Tuple[Dict, int]]): (data_to_add, row_to_update) pairs
+            
+        Returns:
+            List[bool]: Per-deal success, in the order given
+        """
+        # Row values keyed by row number, later deals replacing earlier ones: row -> (deal position, values).
+        # Two PATCHes of one range in a batch would land in no particular order
+        rows: Dict[int, Tuple[int, List[Any]]] = {}
+        for i, (data_to_add, row_to_update) in enumerate(deals):
+            try:
+                values = self._deal_row_values(data_to_add)
+            except KeyError as e:
+                logger.error(f"Skipping deal {data_to_add.get('deal_id')} for row {row_to_update}: missing field {e}")
+                continue
+            if row_to_update in rows:
+                logger.warning(f"Deal at position {rows[row_to_update][0]} superseded by a later deal for row {row_to_update}")
+            rows[row_to_update] = (i, values)
+            
+        # Group rows into runs of consecutive rows: (first_row, [deal positions])
+        runs: List[Tuple[int, List[int]]] = []
+        for row_to_update in sorted(rows):
+            i = rows[row_to_update][0]
+            if runs and row_to_update == runs[-1][0] + len(runs[-1][1]):
+                runs[-1][1].append(i)
+            else:
+                runs.append((row_to_update, [i]))
+                
+        ops = [
+            (self._relative_url(self._deal_row_url(workbook_id, worksheet_name, first_row, first_row + len(positions) - 1)),
+             [rows[first_row + offset][1] for offset in range(len(positions))])
+            for first_row, positions in runs
+        ]
+        responses = self.update_ranges_batch(ops) if ops else []
+        
+        results = [False] * len(deals)
+        for (_, positions), response in zip(runs, responses):
+            for i in positions:
+                results[i] = response.get("status", 500) < 400
+        return results
+
 
     def delete_row_by_id(self, workbook_id: str, worksheet_name: str, id_column: str, id_value: Any) -> bool:
         """
@@ -1250,6 +1858,7 @@ class MSGraphClient:
             
             # Make POST request to the delete endpoint
             result = self._make_request("POST", url, json_data=body)
+            self._invalidate_used_range(workbook_id)
             
             logger.info(f"Successfully deleted row {row_number} from worksheet {worksheet_name}")
             return True
@@ -1264,6 +1873,50 @@ class MSGraphClient:
             logger.error(f"Unexpected error while deleting row {row_number}: {str(e)}")
             return False
 
+    def delete_rows_by_numbers(self, workbook_id: str, worksheet_name: str, rows: List[int]) -> Dict[int, bool]:
+        """
+        Delete several rows by row number with batched requests instead of one request per row.
+        
+        Args:
+            workbook_id (str): The ID of the workbook
+            worksheet_name (str): The name of the worksheet
+            rows (List[int]): The 1-based row numbers to delete
+            
+        Returns:
+            Dict[int, bool]: Whether each row was deleted
+        """
+        # Delete bottom-up so earlier deletions don't shift the rows still to be deleted
+        rows = sorted(set(rows), reverse=True)
+        url = f"{self.items_path}/{workbook_id}/workbook/worksheets/{worksheet_name}"
+
+        requests_list = []
+        for i, row_number in enumerate(rows):
+            request = {
+                "id": str(i),
+                "method": "POST",
+                "url": self._relative_url(f"{url}/range(address='{row_number}:{row_number}')/delete"),
+                "headers": {"Content-Type": "application/json"},
+                "body": {"shift": "Up"},
+            }
+            # Graph may run sub-requests in any order, so chain each delete to the one before it in the same call
+            if i % _BATCH_LIMIT:
+                request["dependsOn"] = [str(i - 1)]
+            requests_list.append(request)
+
+        try:
+            responses = self.batch(requests_list)
+        except requests.exceptions.RequestException:
+            logger.error(f"Failed to send batch delete of {len(rows)} rows from worksheet {worksheet_name}")
+            return {row_number: False for row_number in rows}
+        finally:
+            self._invalidate_used_range(workbook_id)
+
+        results = {
+            row_number: responses.get(str(i), {}).get("status", 500) < 400
+            for i, row_number in enumerate(rows)
+        }
+        logger.info(f"Deleted {sum(results.values())} of {len(rows)} rows from worksheet {worksheet_name}")
+        return results
 
     def delete_deal_from_excel_sheet(self, workbook_id: str, worksheet_name: str, deal_id: str) -> bool:
         """
@@ -1284,6 +1937,40 @@ class MSGraphClient:
         except Exception as e:
             logger.error(f"Error deleting deal '{deal_id}' from Excel sheet: {str(e)}")
             return False
+
+    def delete_deals_from_excel_sheet(self, workbook_id: str, worksheet_name: str, deal_ids: List[str]) -> Dict[str, bool]:
+        """
+        Delete several deal rows from the Excel sheet using one lookup of the ID column.
+        
+        Args:
+            workbook_id (str): The ID of the workbook
+            worksheet_name (str): The name of the worksheet
+            deal_ids (List[str]): The deal IDs to search for and delete
+            
+        Returns:
+            Dict[str, bool]: Whether each deal was found and deleted
+        """
+        results = {deal_id: False for deal_id in deal_ids}
+        
+        try:
+            row_index = self.build_row_index(workbook_id, worksheet_name, "Record ID")
+        except Exception as e:
+            logger.error(f"Error indexing deals in Excel sheet: {str(e)}")
+            return results
+            
+        rows = {}
+        for deal_id in deal_ids:
+            row_number = row_index.get(str(deal_id).lower())
+            if row_number is None:
+                logger.warning(f"Deal '{deal_id}' not found in Excel sheet")
+            else:
+                rows[row_number] = deal_id
+                
+        deleted = self.delete_rows_by_numbers(workbook_id, worksheet_name, list(rows))
+        for row_number, deal_id in rows.items():
+            results[deal_id] = deleted.get(row_number, False)
+            
+        return results
         
 
     def get_row_contents(self, workbook_item_id: str, worksheet_id: str, row_number: int, drive_id: str = None) -> Optional[List[Any]]:
@@ -1405,6 +2092,87 @@ class MSGraphClient:
             
         # Get the cell value using the found column letter
         return self.get_cell_value(workbook_item_id, worksheet_id, row_number, column_letter, drive_id)
+
+    def get_header_letters(self, workbook_item_id: str, worksheet_id: str, header_names: List[str],
+                           drive_id: str = None) -> Dict[str, Optional[str]]:
+        """
+        Resolve header names in row 1 to column letters from the cached header row.
+        
+        Args:
+            workbook_item_id (str): The ID of the workbook item
+            worksheet_id (str): The ID or name of the worksheet
+            header_names (List[str]): The header names to resolve
+            drive_id (str, optional): The drive ID. Uses instance drive_id if not provided.
+            
+        Returns:
+            Dict[str, Optional[str]]: Column letters keyed by header name (None if not found)
+        """
+        return {
+            header_name: self._get_cached_header_letter(workbook_item_id, worksheet_id, header_name, drive_id)
+            for header_name in header_names
+        }
+
+    def get_cell_values_by_headers(self, workbook_item_id: str, worksheet_id: str, row_number: int,
+                                   header_names: List[str], drive_id: str = None,
+                                   raise_errors: bool = False) -> Dict[str, Any]:
+        """
+        Get several cells of one row by header name, reading the row span that covers them in one request.
+        
+        Args:
+            workbook_item_id (str): The ID of the workbook item
+            worksheet_id (str): The ID or name of the worksheet
+            row_number (int): The 1-based row number
+            header_names (List[str]): The header names (in row 1) of the cells to read
+            drive_id (str, optional): The drive ID. Uses instance drive_id if not provided.
+            raise_errors (bool, optional): Re-raise a failed range read instead of returning all-None
+                values, for callers that must tell an empty row from a read error. Defaults to False.
+            
+        Returns:
+            Dict[str, Any]: Cell values keyed by header name (None if missing or empty)
+            
+        Raises:
+            requests.exceptions.RequestException: If raise_errors is set and Graph fails the read
+        """
+        values = {header_name: None for header_name in header_names}
+        
+        if not drive_id and not self.drive_id:
+            logger.error("Drive ID is required")
+            return values
+            
+        drive_id_to_use = drive_id or self.drive_id
+        
+        column_letters = self.get_header_letters(workbook_item_id, worksheet_id, header_names, drive_id_to_use)
+        
+        column_numbers = {}
+        for header_name, column_letter in column_letters.items():
+            if column_letter:
+                column_numbers[header_name] = _column_number(column_letter)
+            else:
+                logger.warning(f"Header '{header_name}' not found")
+        if not column_numbers:
+            return values
+            
+        first_column = min(column_numbers.values())
+        last_column = max(column_numbers.values())
+        range_address = f"{self._column_letter(first_column)}{row_number}:{self._column_letter(last_column)}{row_number}"
+        url = (f"{self.base_url}/drives/{drive_id_to_use}/items/{workbook_item_id}/workbook/worksheets/{worksheet_id}"
+               f"/range(address='{range_address}')?$select=values")
+        
+        try:
+            result = self._make_request("GET", url)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error retrieving range {range_address}: {str(e)}")
+            if raise_errors:
+                raise
+            return values
+            
+        row_values = (result.get("values") or [[]])[0]
+        for header_name, column_number in column_numbers.items():
+            offset = column_number - first_column
+            values[header_name] = row_values[offset] if offset < len(row_values) else None
+        
+        logger.info(f"Retrieved {len(column_numbers)} cells from row {row_number} in range {range_address}")
+        return values
     
 
     def get_worksheet_last_saved_timestamp(self, workbook_item_id: str, worksheet_name: str = None, drive_id: str = None) -> Optional[str]:
@@ -1419,6 +2187,10 @@ class MSGraphClient:
             
         Returns:
             Optional[str]: The last modified timestamp in ISO format, None if not found
+            
+        Raises:
+            requests.exceptions.RequestException: If Graph fails the request (e.g. throttling or a 5xx
+                after the session's retries), so pollers can back off instead of polling at full rate
         """
         if not drive_id and not self.drive_id:
             logger.error("Drive ID is required")
@@ -1426,27 +2198,25 @@ class MSGraphClient:
             
         drive_id_to_use = drive_id or self.drive_id
         
-        # If worksheet_name is provided, verify it exists first
-        if worksheet_name:
+        # If worksheet_name is provided, verify it exists first; once is enough when polling
+        worksheet_key = (workbook_item_id, worksheet_name, drive_id_to_use)
+        if worksheet_name and worksheet_key not in self._known_worksheets:
             worksheet = self.get_worksheet_by_name(workbook_item_id, worksheet_name, drive_id_to_use)
             if not worksheet:
                 logger.warning(f"Worksheet '{worksheet_name}' not found in workbook")
                 return None
+            self._known_worksheets.add(worksheet_key)
         
         # Get the workbook item metadata which contains the last modified timestamp
-        try:
-            workbook_item = self.get_item_by_id(workbook_item_id, drive_id_to_use)
-            
-            if workbook_item and "lastModifiedDateTime" in workbook_item:
-                timestamp = workbook_item["lastModifiedDateTime"]
-                logger.info(f"Last saved timestamp for workbook: {timestamp}")
-                return timestamp
-            else:
-                logger.warning("Last modified timestamp not found in workbook metadata")
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error retrieving last saved timestamp: {str(e)}")
+        workbook_item = self._make_request("GET", _LAST_SAVED_URL.format(
+            base_url=self.base_url, drive_id=drive_id_to_use, item_id=workbook_item_id))
+        
+        if workbook_item and "lastModifiedDateTime" in workbook_item:
+            timestamp = workbook_item["lastModifiedDateTime"]
+            logger.info(f"Last saved timestamp for workbook: {timestamp}")
+            return timestamp
+        else:
+            logger.warning("Last modified timestamp not found in workbook metadata")
             return None
 
     def get_workbook_last_saved_timestamp(self, workbook_name: str, folder_path: str = "", drive_id: str = None) -> Optional[str]:
@@ -1519,4 +2289,89 @@ class MSGraphClient:
                 
         except Exception as e:
             logger.error(f"Error retrieving workbook metadata: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+
+class AsyncMSGraphClient:
+    """
+    Asyncio front end for MSGraphClient so independent Graph calls can be awaited together.
+
+    Each call runs the matching MSGraphClient method in a worker thread, so all calls share the
+    wrapped client's pooled session and the sync API stays the single implementation.
+    """
+
+    def __init__(self, client: MSGraphClient):
+        self.client = client
+
+    @classmethod
+    async def from_customer(cls, customer: object) -> "AsyncMSGraphClient":
+        """Build the wrapped client (which acquires a token) without blocking the event loop"""
+        return cls(await asyncio.to_thread(MSGraphClient, customer))
+
+    async def _run(self, method, *args, **kwargs):
+        return await asyncio.to_thread(method, *args, **kwargs)
+
+    async def close(self) -> None:
+        await self._run(self.client.close)
+
+    async def __aenter__(self) -> "AsyncMSGraphClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def get_used_range(self, workbook_item_id: str, worksheet_id: str, drive_id: str = None) -> Dict:
+        return await self._run(self.client.get_used_range, workbook_item_id, worksheet_id, drive_id)
+
+    async def update_range(self, workbook_item_id: str, worksheet_id: str, range_address: str,
+                           values: List[List[Any]], drive_id: str = None) -> bool:
+        return await self._run(self.client.update_range, workbook_item_id, worksheet_id, range_address, values, drive_id)
+
+    async def delete_row_by_number(self, workbook_id: str, worksheet_name: str, row_number: int) -> bool:
+        return await self._run(self.client.delete_row_by_number, workbook_id, worksheet_name, row_number)
+
+    async def find_row_by_value(self, workbook_item_id: str, worksheet_id: str, column: str,
+                                search_value: Any, case_sensitive: bool = False, drive_id: str = None) -> Optional[int]:
+        return await self._run(self.client.find_row_by_value, workbook_item_id, worksheet_id, column,
+                               search_value, case_sensitive, drive_id)
+
+    async def update_cell(self, workbook_item_id: str, worksheet_id: str, cell_address: str,
+                          value: Any, drive_id: str = None) -> bool:
+        return await self._run(self.client.update_cell, workbook_item_id, worksheet_id, cell_address, value, drive_id)
+
+    async def get_worksheet_last_saved_timestamp(self, workbook_item_id: str, worksheet_name: str = None,
+                                                 drive_id: str = None) -> Optional[str]:
+        return await self._run(self.client.get_worksheet_last_saved_timestamp, workbook_item_id, worksheet_name, drive_id)
+
+    async def get_header_letters(self, workbook_item_id: str, worksheet_id: str, header_names: List[str],
+                                 drive_id: str = None) -> Dict[str, Optional[str]]:
+        return await self._run(self.client.get_header_letters, workbook_item_id, worksheet_id, header_names, drive_id)
+
+    async def get_cell_values_by_headers(self, workbook_item_id: str, worksheet_id: str, row_number: int,
+                                         header_names: List[str], drive_id: str = None,
+                                         raise_errors: bool = False) -> Dict[str, Any]:
+        return await self._run(self.client.get_cell_values_by_headers, workbook_item_id, worksheet_id,
+                               row_number, header_names, drive_id, raise_errors)
+
+    async def download_workbook(self, workbook_name: str, local_path: str = None, drive_id: str = None) -> Optional[str]:
+        return await self._run(self.client.download_workbook, workbook_name, local_path, drive_id)
+
+    async def upload_workbook(self, local_path: str, upload_name: str = None, folder_path: str = "",
+                              drive_id: str = None) -> Optional[Dict]:
+        return await self._run(self.client.upload_workbook, local_path, upload_name, folder_path, drive_id)
+
+    async def export_worksheet_to_csv(self, workbook_item_id: str, worksheet_id: str, local_path: str,
+                                      drive_id: str = None) -> bool:
+        return await self._run(self.client.export_worksheet_to_csv, workbook_item_id, worksheet_id, local_path, drive_id)
+
+    async def export_worksheets_to_csv(self, items: List[Tuple]) -> List[bool]:
+        """
+        Export several worksheets concurrently.
+        
+        Args:
+            items (List[Tuple]): Argument tuples for export_worksheet_to_csv
+            
+        Returns:
+            List[bool]: Per-export success, in the order given
+        """
+        return list(await asyncio.gather(*(self.export_worksheet_to_csv(*item) for item in items)))
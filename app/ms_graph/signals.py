@@ -0,0 +1,21 @@
+import logging
+
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from app.dashboard.models import Customer
+from app.features.models import CustomerFeature
+from app.ms_graph.views import clear_customer_caches
+
+logger = logging.getLogger(__name__)
+
+
+@receiver([post_save, post_delete], sender=Customer)
+@receiver([post_save, post_delete], sender=CustomerFeature)
+def refresh_note_customer_feature(sender, **kwargs):
+    clear_customer_caches()
+    logger.debug(
+        "Cleared cached note customer, feature and clients after %s change",
+        sender.__name__,
+    )
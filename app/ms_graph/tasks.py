@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import random
+from datetime import datetime
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+# Retries for a save that hadn't landed yet, a Graph read error or a HubSpot 5xx/429,
+# backing off from this many seconds
+NOTE_MAX_RETRIES = 3
+NOTE_RETRY_BACKOFF = 5
+
+
+@shared_task(bind=True, max_retries=NOTE_MAX_RETRIES)
+def process_excel_note(self, excel_row, submitted_at, note=None):
+    """
+    Send the note in an Excel row to HubSpot, as queued by excel_note_to_hubspot.
+
+    A retry after a failed HubSpot call gets the row contents already read as note,
+    so only the HubSpot call is repeated and the note isn't posted twice.
+    """
+    # Imported here because the view module imports this one to queue the task
+    from app.ms_graph.views import NoteSubmissionError
+    from app.ms_graph.views import TransientNoteError
+    from app.ms_graph.views import _get_customer_and_feature
+    from app.ms_graph.views import submit_excel_note
+
+    # Loaded here, outside the event loop, so the query runs on the task's own
+    # connection, which Celery closes after the task; one opened in an asgiref
+    # thread would leak
+    customer, feature = _get_customer_and_feature()
+    if not customer or not feature:
+        logger.error("Excel note for row %s failed: no customer feature", excel_row)
+        msg = "Customer or feature configuration not found"
+        raise NoteSubmissionError(msg)
+
+    submitted = datetime.fromisoformat(submitted_at)
+    try:
+        result = asyncio.run(
+            submit_excel_note(excel_row, submitted, customer, feature, note),
+        )
+    except TransientNoteError as e:
+        if self.request.retries < self.max_retries:
+            # At least half the backoff, so HubSpot's search index has caught up with
+            # a note the failed attempt may have created before the retry looks for it
+            backoff = NOTE_RETRY_BACKOFF * 2**self.request.retries
+            countdown = random.uniform(backoff / 2, backoff)  # noqa: S311
+            logger.warning(
+                "Excel note for row %s (deal %s) failed, retrying in %.1fs: %s",
+                excel_row,
+                e.deal_id,
+                countdown,
+                e,
+            )
+            kwargs = {"note": e.note or note}
+            raise self.retry(exc=e, countdown=countdown, kwargs=kwargs) from e
+        logger.exception(
+            "Excel note for row %s (deal %s) failed after %s retries",
+            excel_row,
+            e.deal_id,
+            self.max_retries,
+        )
+        raise
+    except NoteSubmissionError as e:
+        logger.exception("Excel note for row %s (deal %s) failed", excel_row, e.deal_id)
+        raise
+
+    if result is None:
+        logger.warning("Excel note for row %s had no note to submit", excel_row)
+    return result
@@ -0,0 +1,331 @@
+import asyncio
+import json
+import time
+from http import HTTPStatus
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+import requests
+
+from app.ms_graph import client as graph_client
+from app.ms_graph.client import AsyncMSGraphClient
+from app.ms_graph.client import MSGraphClient
+from app.ms_graph.client import _GraphRetry
+
+BASE_URL = "https://graph.microsoft.com/v1.0"
+LAST_SAVED_SELECT = "$select=lastModifiedDateTime"
+
+# Rows of the Record ID column served by _sheet
+HEADER_ROW = 1
+DEAL_101_ROW = 2
+DEAL_ABC_ROW = 4
+
+
+def _response(body=None, status=HTTPStatus.OK):
+    response = mock.Mock(status_code=status, text=json.dumps(body or {}))
+    response.content = json.dumps(body).encode() if body is not None else b""
+    if status >= HTTPStatus.BAD_REQUEST:
+        error = requests.exceptions.HTTPError(response=response)
+        response.raise_for_status.side_effect = error
+    return response
+
+
+def _batch_ok(method, url, data=None, **kwargs):
+    """Answer every $batch sub-request with 200."""
+    sub_requests = json.loads(data)["requests"]
+    responses = [{"id": r["id"], "status": 200, "body": {}} for r in sub_requests]
+    return _response({"responses": responses})
+
+
+@pytest.fixture
+def session():
+    return mock.Mock()
+
+
+@pytest.fixture
+def ms_client(session, monkeypatch):
+    monkeypatch.setattr(
+        MSGraphClient,
+        "get_msgraph_access_token",
+        lambda self, customer: "token",
+    )
+    monkeypatch.setattr(graph_client, "_download_dir_ready", True)
+    customer = SimpleNamespace(msgraph_site_id="site", msgraph_drive_id="drive")
+    client = MSGraphClient(customer)
+    client._token_expires_at = time.monotonic() + 3600  # noqa: SLF001
+    client._session = session  # noqa: SLF001
+    return client
+
+
+def _sent(session):
+    """(method, url, decoded body) for every request sent through the session."""
+    calls = []
+    for call in session.request.call_args_list:
+        data = call.kwargs.get("data")
+        body = json.loads(data) if data else None
+        calls.append((call.kwargs["method"], call.kwargs["url"], body))
+    return calls
+
+
+def test_batch_sends_20_sub_requests_per_call(ms_client, session):
+    session.request.side_effect = _batch_ok
+    requests_list = [
+        {"id": str(i), "method": "GET", "url": f"/me/items/{i}"} for i in range(45)
+    ]
+
+    responses = ms_client.batch(requests_list)
+
+    sent = _sent(session)
+    assert [len(body["requests"]) for _, _, body in sent] == [20, 20, 5]
+    assert all(
+        method == "POST" and url == f"{BASE_URL}/$batch" for method, url, _ in sent
+    )
+    assert set(responses) == {str(i) for i in range(45)}
+
+
+def test_delete_rows_by_numbers_chains_deletes_bottom_up(ms_client, session):
+    session.request.side_effect = _batch_ok
+
+    results = ms_client.delete_rows_by_numbers("wb", "Deals", [*range(2, 27), 5])
+
+    first, second = (body["requests"] for _, _, body in _sent(session))
+    # Bottom-up, each delete depending on the previous one within its HTTP call
+    assert "range(address='26:26')/delete" in first[0]["url"]
+    assert "dependsOn" not in first[0]
+    assert [r["dependsOn"] for r in first[1:]] == [[str(i)] for i in range(19)]
+    assert "dependsOn" not in second[0]
+    assert second[1]["dependsOn"] == ["20"]
+    assert "range(address='2:2')/delete" in second[-1]["url"]
+    assert results == dict.fromkeys(range(2, 27), True)
+
+
+def test_delete_rows_by_numbers_reports_failed_sub_requests(ms_client, session):
+    session.request.return_value = _response(
+        {"responses": [{"id": "0", "status": 200}, {"id": "1", "status": 424}]},
+    )
+
+    results = ms_client.delete_rows_by_numbers("wb", "Deals", [3, 8])
+
+    assert results == {8: True, 3: False}
+
+
+def test_update_ranges_batch_returns_status_per_range(ms_client, session):
+    session.request.return_value = _response(
+        {"responses": [{"id": "1", "status": 200}, {"id": "0", "status": 400}]},
+    )
+
+    responses = ms_client.update_ranges_batch(
+        [("/a", [[1]]), ("/b", [[2]]), ("/c", [[3]])],
+    )
+
+    assert [r["status"] for r in responses] == [400, 200, 500]
+    body = _sent(session)[0][2]
+    assert [(r["method"], r["url"], r["body"]) for r in body["requests"]] == [
+        ("PATCH", "/a", {"values": [[1]]}),
+        ("PATCH", "/b", {"values": [[2]]}),
+        ("PATCH", "/c", {"values": [[3]]}),
+    ]
+
+
+def _sheet(method, url, **kwargs):
+    """Header row A:C and a Record ID column starting at row 1."""
+    if "range(address='1:1')" in url:
+        headers = [["Deal Name", "Record ID", "Submit a Note"]]
+        return _response({"values": headers, "columnIndex": 0})
+    if "range(address='B:B')" in url:
+        ids = [["Record ID"], ["101"], [""], ["ABC"], ["101"]]
+        return _response({"values": ids, "rowIndex": 0})
+    if "range(address='A5:C5')" in url:
+        return _response({"values": [["Acme", "101", " call back "]]})
+    if url.endswith(LAST_SAVED_SELECT):
+        return _response({"lastModifiedDateTime": "2026-01-01T00:00:00Z"})
+    msg = f"Unexpected request {method} {url}"
+    raise AssertionError(msg)
+
+
+def test_build_row_index_reads_only_the_id_column(ms_client, session):
+    session.request.side_effect = _sheet
+
+    row_index = ms_client.build_row_index("wb", "Deals", "Record ID")
+
+    assert row_index == {
+        "record id": HEADER_ROW,
+        "101": DEAL_101_ROW,
+        "abc": DEAL_ABC_ROW,
+    }
+    header_read, column_read = (url for _, url, _ in _sent(session))
+    assert "range(address='1:1')" in header_read
+    assert "usedRange(valuesOnly=true)" in column_read
+
+
+def _id_column_reads(session):
+    return sum("range(address='B:B')" in url for _, url, _ in _sent(session))
+
+
+def _find(ms_client, id_value):
+    return ms_client.find_row_by_id("wb", "Deals", "Record ID", id_value)
+
+
+def test_find_row_by_id_reuses_the_index_while_unchanged(ms_client, session):
+    session.request.side_effect = _sheet
+
+    assert _find(ms_client, "abc") == DEAL_ABC_ROW
+    assert _find(ms_client, 101) == DEAL_101_ROW
+    assert _find(ms_client, "missing") is None
+    assert _id_column_reads(session) == 1
+
+
+def test_find_row_by_id_rebuilds_the_index_after_an_excel_edit(ms_client, session):
+    modified = iter(["2026-01-01T00:00:00Z", "2026-01-01T00:05:00Z"])
+
+    def sheet(method, url, **kwargs):
+        if url.endswith(LAST_SAVED_SELECT):
+            return _response({"lastModifiedDateTime": next(modified)})
+        return _sheet(method, url, **kwargs)
+
+    session.request.side_effect = sheet
+
+    assert _find(ms_client, "abc") == DEAL_ABC_ROW
+    reads = _id_column_reads(session)
+    assert _find(ms_client, "abc") == DEAL_ABC_ROW
+    assert _id_column_reads(session) == reads + 1
+
+
+def test_find_row_by_id_rebuilds_the_index_without_a_timestamp(ms_client, session):
+    def sheet(method, url, **kwargs):
+        if url.endswith(LAST_SAVED_SELECT):
+            return _response({}, status=HTTPStatus.TOO_MANY_REQUESTS)
+        return _sheet(method, url, **kwargs)
+
+    session.request.side_effect = sheet
+
+    assert _find(ms_client, "abc") == DEAL_ABC_ROW
+    reads = _id_column_reads(session)
+    assert _find(ms_client, "abc") == DEAL_ABC_ROW
+    assert _id_column_reads(session) == reads + 1
+
+
+def test_get_cell_values_by_headers_reads_one_range(ms_client, session):
+    session.request.side_effect = _sheet
+    headers = ["Submit a Note", "Deal Name", "Missing"]
+
+    values = ms_client.get_cell_values_by_headers("wb", "Deals", 5, headers)
+
+    assert values == {
+        "Submit a Note": " call back ",
+        "Deal Name": "Acme",
+        "Missing": None,
+    }
+    last_url = _sent(session)[-1][1]
+    assert last_url.endswith("range(address='A5:C5')?$select=values")
+
+
+def test_get_cell_values_by_headers_can_raise_read_errors(ms_client, session):
+    def sheet(method, url, **kwargs):
+        if "range(address='A5:C5')" in url:
+            return _response({}, status=HTTPStatus.SERVICE_UNAVAILABLE)
+        return _sheet(method, url, **kwargs)
+
+    session.request.side_effect = sheet
+    headers = ["Submit a Note", "Deal Name"]
+
+    values = ms_client.get_cell_values_by_headers("wb", "Deals", 5, headers)
+    assert values == {"Submit a Note": None, "Deal Name": None}
+    with pytest.raises(requests.exceptions.HTTPError):
+        ms_client.get_cell_values_by_headers(
+            "wb",
+            "Deals",
+            5,
+            headers,
+            raise_errors=True,
+        )
+
+
+def test_parse_deals_to_excel_sheet_writes_each_row_once(ms_client, monkeypatch):
+    fields = (
+        "name",
+        "city",
+        "state",
+        "associated_contact",
+        "associated_company",
+        "deal_stage",
+        "deal_owner",
+        "last_contacted",
+        "last_contacted_type",
+        "last_engagement",
+        "last_engagement_type",
+        "email",
+        "call",
+        "meeting",
+        "note",
+        "task",
+    )
+    deal = {field: field for field in fields}
+    update = mock.Mock(side_effect=lambda ops: [{"status": 200}] * len(ops))
+    monkeypatch.setattr(ms_client, "update_ranges_batch", update)
+
+    results = ms_client.parse_deals_to_excel_sheet(
+        "wb",
+        "Deals",
+        [
+            ({**deal, "deal_id": "1"}, 5),
+            ({**deal, "deal_id": "2"}, 6),
+            ({**deal, "deal_id": "3"}, 5),
+            ({"deal_id": "4"}, 7),
+            ({**deal, "deal_id": "5"}, 9),
+        ],
+    )
+
+    assert results == [False, True, True, False, True]
+    (ops,), _ = update.call_args
+    written = [
+        (url.split("address=")[1], [row[0] for row in values]) for url, values in ops
+    ]
+    assert written == [("'A5:T6')", ["3", "2"]), ("'A9:T9')", ["5"])]
+
+
+def test_get_worksheet_last_saved_timestamp_raises_graph_errors(ms_client, session):
+    session.request.return_value = _response({}, status=HTTPStatus.TOO_MANY_REQUESTS)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        ms_client.get_worksheet_last_saved_timestamp("wb")
+
+
+def test_csv_export_fails_when_a_window_has_no_values(ms_client, monkeypatch, tmp_path):
+    monkeypatch.setattr(ms_client, "get_range", lambda *args: {})
+    summary = {"rowIndex": 0, "rowCount": 3, "columnIndex": 0, "columnCount": 2}
+    export = ms_client._export_worksheet_to_csv_windowed  # noqa: SLF001
+
+    assert export("wb", "Deals", str(tmp_path / "out.csv"), summary) is False
+
+
+def test_async_client_wraps_the_sync_client(ms_client, session):
+    session.request.side_effect = _sheet
+    async_client = AsyncMSGraphClient(ms_client)
+
+    letters = asyncio.run(
+        async_client.get_header_letters("wb", "Deals", ["Record ID", "Missing"]),
+    )
+
+    assert letters == {"Record ID": "B", "Missing": None}
+
+
+@pytest.mark.parametrize(
+    ("method", "status", "expected"),
+    [
+        ("GET", 503, True),
+        ("PATCH", 500, True),
+        ("POST", 429, True),
+        ("POST", 500, False),
+        ("POST", 503, False),
+    ],
+)
+def test_graph_retry_only_resends_posts_on_429(method, status, expected):
+    retry = _GraphRetry(
+        total=3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET", "PUT", "PATCH", "DELETE"]),
+    )
+
+    assert retry.is_retry(method, status) is expected
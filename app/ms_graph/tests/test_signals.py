@@ -0,0 +1,25 @@
+import pytest
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+
+from app.dashboard.models import Customer
+from app.features.models import CustomerFeature
+from app.ms_graph import views
+
+
+@pytest.fixture
+def cached_note_state(monkeypatch):
+    cached = (float("inf"), object(), object())
+    monkeypatch.setattr(views, "_customer_feature_cache", cached)
+    monkeypatch.setattr(views, "_graph_clients", {1: object()})
+    monkeypatch.setattr(views, "_hubspot_clients", {1: object()})
+
+
+@pytest.mark.parametrize("sender", [Customer, CustomerFeature])
+@pytest.mark.parametrize("signal", [post_save, post_delete])
+def test_customer_changes_clear_note_caches(cached_note_state, sender, signal):
+    signal.send(sender=sender, instance=None)
+
+    assert views._customer_feature_cache is None  # noqa: SLF001
+    assert views._graph_clients == {}  # noqa: SLF001
+    assert views._hubspot_clients == {}  # noqa: SLF001
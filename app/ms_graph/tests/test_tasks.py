@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.ms_graph import views
+from app.ms_graph.tasks import NOTE_MAX_RETRIES
+from app.ms_graph.tasks import process_excel_note
+from app.ms_graph.views import NoteSubmissionError
+from app.ms_graph.views import TransientNoteError
+
+SUBMITTED_AT = "2025-01-06T12:00:00+00:00"
+
+
+@pytest.fixture
+def configuration(monkeypatch):
+    customer, feature = SimpleNamespace(id=1), SimpleNamespace(id=2)
+    monkeypatch.setattr(views, "_get_customer_and_feature", lambda: (customer, feature))
+    return customer, feature
+
+
+@pytest.fixture
+def submissions(monkeypatch, configuration):
+    """Replace submit_excel_note with one that plays back the given outcomes."""
+    calls = []
+
+    def play(*outcomes):
+        async def submit_excel_note(excel_row, submitted, customer, feature, note):
+            assert (customer, feature) == configuration
+            outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+            calls.append((excel_row, submitted.isoformat(), note))
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        monkeypatch.setattr(views, "submit_excel_note", submit_excel_note)
+        return calls
+
+    return play
+
+
+def test_process_excel_note_returns_the_deal(submissions):
+    calls = submissions({"deal_id": "101"})
+
+    result = process_excel_note.apply(args=(5, SUBMITTED_AT))
+
+    assert result.get() == {"deal_id": "101"}
+    assert calls == [(5, SUBMITTED_AT, None)]
+
+
+def test_process_excel_note_retries_transient_failures(submissions):
+    outcomes = [TransientNoteError("not saved")] * 2 + [{"deal_id": "101"}]
+    calls = submissions(*outcomes)
+
+    result = process_excel_note.apply(args=(5, SUBMITTED_AT))
+
+    assert result.get() == {"deal_id": "101"}
+    assert len(calls) == len(outcomes)
+
+
+def test_process_excel_note_retries_only_the_hubspot_call_once_read(submissions):
+    note = {"deal_id": "101", "note": "call back"}
+    calls = submissions(
+        TransientNoteError("not saved"),
+        TransientNoteError("HubSpot down", deal_id="101", note=note),
+        TransientNoteError("HubSpot down", deal_id="101"),
+        {"deal_id": "101"},
+    )
+
+    result = process_excel_note.apply(args=(5, SUBMITTED_AT))
+
+    assert result.get() == {"deal_id": "101"}
+    assert [call[2] for call in calls] == [None, None, note, note]
+
+
+def test_process_excel_note_gives_up_after_max_retries(submissions, caplog):
+    calls = submissions(TransientNoteError("HubSpot down", deal_id="101"))
+
+    result = process_excel_note.apply(args=(5, SUBMITTED_AT))
+
+    with pytest.raises(TransientNoteError):
+        result.get()
+    assert len(calls) == NOTE_MAX_RETRIES + 1
+    assert "row 5 (deal 101) failed after" in caplog.text
+
+
+def test_process_excel_note_does_not_retry_other_failures(submissions, caplog):
+    calls = submissions(NoteSubmissionError("Deal ID not found in Excel row"))
+
+    result = process_excel_note.apply(args=(5, SUBMITTED_AT))
+
+    with pytest.raises(NoteSubmissionError):
+        result.get()
+    assert len(calls) == 1
+    assert "Excel note for row 5 (deal None) failed" in caplog.text
+
+
+def test_process_excel_note_fails_without_a_configured_feature(monkeypatch, caplog):
+    monkeypatch.setattr(views, "_get_customer_and_feature", lambda: (None, None))
+
+    result = process_excel_note.apply(args=(5, SUBMITTED_AT))
+
+    with pytest.raises(NoteSubmissionError):
+        result.get()
+    assert "Excel note for row 5 failed: no customer feature" in caplog.text
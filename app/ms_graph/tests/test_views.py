@@ -0,0 +1,258 @@
+import asyncio
+import time
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+import requests
+
+from app.hubspot.client import HubSpotServerError
+from app.ms_graph import views
+from app.ms_graph.views import _SIGNER
+from app.ms_graph.views import SIGNATURE_MAX_AGE
+from app.ms_graph.views import _parse_row
+from app.ms_graph.views import wait_for_sheet_save
+
+ROW = 42
+UNSIGNED_ROW = 7
+LAST_EXCEL_ROW = 1048576
+CLICKED_AT = datetime(2025, 1, 6, 12, 0, 0, tzinfo=UTC)
+SAVED = (CLICKED_AT + timedelta(seconds=1)).isoformat()
+NOT_SAVED = (CLICKED_AT - timedelta(seconds=10)).isoformat()
+
+
+def _sign(value, age=0):
+    with mock.patch("time.time", return_value=time.time() - age):
+        return _SIGNER.sign(value).decode()
+
+
+def test_parse_row_signed():
+    assert _parse_row(_sign(str(ROW))) == ROW
+
+
+def test_parse_row_expired():
+    assert _parse_row(_sign(str(ROW), age=SIGNATURE_MAX_AGE + 60)) is None
+
+
+def test_parse_row_tampered():
+    signed = _sign(str(ROW))
+    assert _parse_row(signed.replace(str(ROW), str(ROW + 1), 1)) is None
+    payload, signature = signed.rsplit(".", 1)
+    flipped = ("B" if signature[0] == "A" else "A") + signature[1:]
+    assert _parse_row(f"{payload}.{flipped}") is None
+
+
+@pytest.mark.parametrize("value", ["abc", "4a", "-1", "1e3", " 4", ""])
+def test_parse_row_non_decimal(value):
+    assert _parse_row(value) is None
+
+
+@pytest.mark.parametrize("value", ["0", "1048577", "99999999999"])
+def test_parse_row_out_of_range(value):
+    assert _parse_row(value) is None
+    assert _parse_row(_sign(value)) is None
+
+
+def test_parse_row_unsigned(settings):
+    settings.EXCEL_ALLOW_UNSIGNED_ROWS = True
+    assert _parse_row(str(UNSIGNED_ROW)) == UNSIGNED_ROW
+    assert _parse_row(str(LAST_EXCEL_ROW)) == LAST_EXCEL_ROW
+
+
+def test_parse_row_unsigned_disabled(settings):
+    settings.EXCEL_ALLOW_UNSIGNED_ROWS = False
+    assert _parse_row(str(UNSIGNED_ROW)) is None
+    assert _parse_row(_sign(str(UNSIGNED_ROW))) == UNSIGNED_ROW
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the poll sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.delays = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.delays.append(delay)
+        self.now += delay
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(views, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(views, "asyncio", SimpleNamespace(sleep=clock.sleep))
+    # Take the top of every jittered delay so the schedule is predictable
+    top = SimpleNamespace(uniform=lambda low, high: high)
+    monkeypatch.setattr(views, "random", top)
+    return clock
+
+
+def _poll(timestamps, **kwargs):
+    ms_client = mock.Mock()
+    probe = mock.AsyncMock(side_effect=timestamps)
+    ms_client.get_worksheet_last_saved_timestamp = probe
+    kwargs.setdefault("since", CLICKED_AT)
+    result = asyncio.run(wait_for_sheet_save(ms_client, "wb", "Deals", **kwargs))
+    return result, probe.await_count
+
+
+def test_wait_for_sheet_save_returns_a_landed_save_without_sleeping(clock):
+    result, probes = _poll([SAVED])
+
+    assert result == datetime.fromisoformat(SAVED)
+    assert probes == 1
+    assert clock.delays == []
+
+
+def test_wait_for_sheet_save_accepts_saves_within_tolerance(clock):
+    just_before = (CLICKED_AT - timedelta(seconds=1)).isoformat()
+
+    result, _ = _poll([just_before], tolerance=2)
+    assert result == datetime.fromisoformat(just_before)
+    result, _ = _poll([just_before, SAVED], tolerance=0)
+    assert result == datetime.fromisoformat(SAVED)
+
+
+def test_wait_for_sheet_save_backs_off_up_to_poll_interval(clock):
+    timestamps = [NOT_SAVED, NOT_SAVED, NOT_SAVED, SAVED]
+    result, probes = _poll(timestamps, timeout=6, poll_interval=1, base_delay=0.5)
+
+    assert result == datetime.fromisoformat(SAVED)
+    assert probes == len(timestamps)
+    assert clock.delays == [0.5, 1.0, 1.0]
+
+
+def test_wait_for_sheet_save_backs_off_further_on_graph_errors(clock):
+    error = views.NoteSubmissionError("throttled")
+    timestamps = [error, error, SAVED]
+    result, probes = _poll(timestamps, timeout=6, poll_interval=1, base_delay=0.5)
+
+    assert result == datetime.fromisoformat(SAVED)
+    assert probes == len(timestamps)
+    assert clock.delays == [1.0, 2.0]
+
+
+def test_wait_for_sheet_save_probes_once_more_at_the_deadline(clock):
+    timestamps = [NOT_SAVED] * 10
+    result, probes = _poll(timestamps, timeout=2, poll_interval=1, base_delay=0.5)
+
+    assert result is None
+    assert clock.delays == [0.5, 1.0, 0.5]
+    assert probes == len(clock.delays) + 1
+
+
+CUSTOMER = SimpleNamespace(id=1, hubspot_secret_app_key="key")  # noqa: S106
+FEATURE = SimpleNamespace(
+    id=2,
+    workbook_id="wb",
+    worksheet_id="ws",
+    worksheet_name="Deals",
+)
+SUBMITTED_MS = int(CLICKED_AT.timestamp() * 1000)
+# Row contents a retry receives from the attempt whose HubSpot call failed
+READ_NOTE = {
+    "deal_id": "101",
+    "deal_name": "Acme",
+    "note": "call back",
+    "note_column": "C",
+    "last_saved": "2025-01-06 12:00:01.000+00:00",
+}
+
+
+def _submit(note=None):
+    return asyncio.run(views.submit_excel_note(5, CLICKED_AT, CUSTOMER, FEATURE, note))
+
+
+@pytest.fixture
+def note_client(monkeypatch):
+    """Graph client for submit_excel_note: the save lands at once, row 5 has a note."""
+    ms_client = mock.Mock()
+    ms_client.get_worksheet_last_saved_timestamp = mock.AsyncMock(return_value=SAVED)
+    ms_client.get_header_letters = mock.AsyncMock(return_value={"Submit a Note": "C"})
+    row = {"Submit a Note": "call back", "Record ID": "101", "Deal Name": "Acme"}
+    ms_client.get_cell_values_by_headers = mock.AsyncMock(return_value=row)
+    ms_client.update_cell = mock.AsyncMock(return_value=True)
+    get_graph_client = mock.AsyncMock(return_value=ms_client)
+    monkeypatch.setattr(views, "_get_graph_client", get_graph_client)
+    return ms_client
+
+
+def test_submit_excel_note_retries_a_failed_row_read(note_client):
+    read_row = note_client.get_cell_values_by_headers
+    read_row.side_effect = requests.exceptions.ConnectionError()
+
+    with pytest.raises(views.TransientNoteError):
+        _submit()
+    assert read_row.await_args.kwargs["raise_errors"] is True
+
+
+def test_submit_excel_note_retries_a_failed_header_read(note_client):
+    note_client.get_header_letters.side_effect = requests.exceptions.HTTPError()
+
+    with pytest.raises(views.TransientNoteError):
+        _submit()
+    note_client.get_cell_values_by_headers.assert_not_awaited()
+
+
+@pytest.fixture
+def hubspot(monkeypatch):
+    hs_client = mock.Mock()
+    hs_client.find_note_on_deal.return_value = None
+    hs_client.create_note_on_deal.return_value = {"id": "9"}
+    monkeypatch.setattr(views, "_hubspot_clients", {CUSTOMER.id: hs_client})
+    return hs_client
+
+
+def test_submit_excel_note_stamps_the_note_with_the_submit_time(note_client, hubspot):
+    result = _submit()
+
+    assert result["deal_id"] == "101"
+    hubspot.find_note_on_deal.assert_not_called()
+    hubspot.create_note_on_deal.assert_called_once_with(
+        "101",
+        "call back",
+        raise_server_errors=True,
+        timestamp=SUBMITTED_MS,
+    )
+    note_client.update_cell.assert_awaited_once_with("wb", "ws", "C5", "")
+
+
+def test_submit_excel_note_hands_the_read_row_to_the_retry(note_client, hubspot):
+    hubspot.create_note_on_deal.side_effect = HubSpotServerError("HubSpot returned 502")
+
+    with pytest.raises(views.TransientNoteError) as excinfo:
+        _submit()
+
+    assert excinfo.value.deal_id == "101"
+    assert excinfo.value.note == READ_NOTE
+    note_client.update_cell.assert_not_awaited()
+
+
+def test_submit_excel_note_retry_skips_a_note_already_created(note_client, hubspot):
+    hubspot.find_note_on_deal.return_value = {"id": "9"}
+
+    result = _submit(READ_NOTE)
+
+    assert result["note"] == "call back"
+    note_client.get_cell_values_by_headers.assert_not_awaited()
+    hubspot.find_note_on_deal.assert_called_once_with(
+        "101",
+        SUBMITTED_MS,
+        raise_server_errors=True,
+    )
+    hubspot.create_note_on_deal.assert_not_called()
+    note_client.update_cell.assert_awaited_once_with("wb", "ws", "C5", "")
+
+
+def test_submit_excel_note_retry_creates_a_missing_note(note_client, hubspot):
+    _submit(READ_NOTE)
+
+    hubspot.create_note_on_deal.assert_called_once()
+    note_client.get_cell_values_by_headers.assert_not_awaited()
@@ -1,61 +1,170 @@
+import asyncio
 import logging
+import random
 import time
 
-from datetime import datetime, timezone
-from dateutil import parser
+from html import escape
 
+from datetime import datetime, timezone, timedelta
+from functools import lru_cache
+from typing import Optional
+
+import requests
 from django.conf import settings
-from django.shortcuts import render
-from django.http import HttpResponse, Http404
+from django.db import transaction
+from django.http import HttpResponse
 from django.core.exceptions import ObjectDoesNotExist
-from django.template import Template, Context
 from itsdangerous import TimestampSigner, BadSignature, SignatureExpired
-import time
-from datetime import datetime, timezone, timedelta
 
-from app.dashboard.models import Customer 
-from app.ms_graph.client import MSGraphClient 
-from app.hubspot.client import HubSpotClient
+from app.features.models import CustomerFeature
+from app.ms_graph.client import AsyncMSGraphClient
+from app.hubspot.client import HubSpotClient, HubSpotServerError
+from app.ms_graph.tasks import process_excel_note
 
 logger = logging.getLogger(__name__)
 
-def wait_for_sheet_save(
+# Signer for the row links written into the sheet, built once with the project-level secret
+_SIGNER = TimestampSigner(getattr(settings, "EXCEL_SIGNATURE_SECRET", settings.SECRET_KEY))
+SIGNATURE_MAX_AGE = 3600
+
+# Last row number an Excel worksheet can have
+_MAX_EXCEL_ROWS = 1048576
+
+# Customer and feature behind note submissions, kept briefly between requests: (expires_at, customer, feature).
+# Saves to either model clear it, and the shared clients (see signals.py); the TTL bounds staleness in other worker processes
+_CUSTOMER_FEATURE_TTL = 300
+_customer_feature_cache = None
+
+# Clients reused across requests so pooled connections and tokens outlive one submission, keyed by customer ID
+_graph_clients = {}
+_hubspot_clients = {}
+
+# Sheet columns read for each submitted note
+_NOTE_HEADERS = ["Submit a Note", "Record ID", "Deal Name"]
+
+# Columns read by excel_note_to_hubspot; the customer's credentials are decrypted from these
+_CUSTOMER_FEATURE_FIELDS = (
+    "id",
+    "workbook_id",
+    "worksheet_id",
+    "worksheet_name",
+    "customer",
+    "customer___hubspot_secret_app_key",
+    "customer___msgraph_site_id",
+    "customer___msgraph_drive_id",
+    "customer___msgraph_client_id",
+    "customer___msgraph_client_secret",
+    "customer___msgraph_tenant_id",
+    "customer___msgraph_scopes",
+)
+
+# Response pages are plain format strings; every substituted value is HTML-escaped first
+_SUCCESS_HTML = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>Success</title>
+            <meta charset="utf-8">
+        </head>
+        <body>
+            <div style="font-family: Arial, sans-serif; text-align: center; padding: 20px;">
+            <h2 style="color: green;">✓ Success</h2>
+            <p>{message}</p>
+            <br>
+            <p><strong>Row ID</strong> {row_id}<br>
+            <strong>Deal ID</strong> {deal_id}<br>
+            <strong>Deal Name</strong> {deal_name}<br>
+            <strong>Note</strong> {note}<br>
+            <strong>Workbook Last Saved Timestamp</strong> {last_saved}<br>
+            <strong>Submission happened at</strong> {submitted}</p>
+            <br>
+            <p><small>This window will close automatically...</small></p>
+            </div>
+            
+        </body>
+        </html>
+        """
+
+_ERROR_HTML = """
+    <!DOCTYPE html>
+    <html>
+      <head>
+        <title>Error</title>
+        <meta charset="utf-8">
+      </head>
+      <body>
+        <div style="font-family: Arial, sans-serif; text-align: center; padding: 20px;">
+          <h2 style="color: red;">✗ Error</h2>
+          <p>{error_message}</p>
+          <p><small>This window will close automatically...</small></p>
+        </div>
+        <script>
+          setTimeout(() => {{
+            try {{
+              window.close();
+            }} catch (e) {{
+              // Fallback if window.close() is blocked
+              document.body.innerHTML = '<div style="text-align: center; padding: 20px;"><h3>Please close this window</h3></div>';
+            }}
+          }}, 3000);
+        </script>
+      </body>
+    </html>
+    """
+
+_DEAL_INFO_FIELDS = ("row_id", "deal_id", "deal_name", "note", "last_saved", "submitted")
+
+
+async def wait_for_sheet_save(
     ms_client,
     workbook_item_id: str,
     worksheet_name: str,
-    timeout: int = 60,
-    poll_interval: int = 5,
-) -> bool:
+    timeout: int = 6,
+    poll_interval: int = 1,
+    tolerance: int = 2,
+    base_delay: float = 0.5,
+    since: Optional[datetime] = None,
+) -> Optional[datetime]:
     """
-    Polls OneDrive to wait until the Excel sheet has been saved after the current timestamp.
+    Polls OneDrive to wait until the Excel sheet has been saved around the current timestamp.
 
     Args:
-        ms_client: Microsoft Graph client with method get_worksheet_last_saved_timestamp
+        ms_client: AsyncMSGraphClient (or any client with an awaitable get_worksheet_last_saved_timestamp)
         workbook_item_id (str): OneDrive item ID of the workbook.
         worksheet_name (str): Name of the worksheet to check.
         timeout (int): Max seconds to wait before giving up.
-        poll_interval (int): How often to recheck, in seconds.
+        poll_interval (int): Longest wait between checks, in seconds.
+        tolerance (int): Seconds before the call that still count as the save, since
+            the save and the click that triggers this view land at about the same time.
+        base_delay (float): First wait between checks, in seconds; doubles on each retry.
+            Failed checks (Graph errors such as throttling) back off from twice this, without
+            the poll_interval cap; every wait is still cut off at the deadline.
+        since (datetime, optional): When the save was triggered; defaults to now.
 
     Returns:
-        bool: True if save detected, False if timeout exceeded.
+        Optional[datetime]: The detected save timestamp, or None if timeout exceeded.
     """
-    start_time = datetime.now(timezone.utc)
-    deadline = start_time + timedelta(seconds=timeout)
+    start_time = since or datetime.now(timezone.utc)
+    # Wall-clock time is only needed for comparing with Graph's timestamps
+    deadline = time.monotonic() + timeout
+    saved_after = start_time - timedelta(seconds=tolerance)
 
     logger.info("Polling for worksheet save after %s", start_time.isoformat())
 
-    while datetime.now(timezone.utc) < deadline:
+    attempt = 0
+    error_attempt = 0
+    # Probe first so a save that already landed returns without sleeping; the last
+    # sleep ends at the deadline and is followed by one final probe
+    while True:
+        failed = False
         try:
-            last_saved_raw = ms_client.get_worksheet_last_saved_timestamp(
+            last_saved_raw = await ms_client.get_worksheet_last_saved_timestamp(
                 workbook_item_id=workbook_item_id,
                 worksheet_name=worksheet_name,
             )
 
-            
-            print(f"\n\n\nstart time: {start_time} | deadline: {deadline} | last saved: {last_saved_raw}\n\n\n")
-
             try:
-                last_saved = parser.isoparse(last_saved_raw) if isinstance(last_saved_raw, str) else last_saved_raw
+                last_saved = datetime.fromisoformat(last_saved_raw) if isinstance(last_saved_raw, str) else last_saved_raw
             except Exception as parse_err:
                 logger.warning("Could not parse last saved timestamp: %s", parse_err)
                 last_saved = None
@@ -63,157 +172,307 @@ def wait_for_sheet_save(
             if last_saved:
                 logger.debug("Last saved timestamp: %s", last_saved.isoformat())
 
-                if last_saved > start_time:
+                if last_saved >= saved_after:
                     logger.info("Detected save after %s. Proceeding.", start_time.isoformat())
-                    return True
+                    return last_saved
 
         except Exception as e:
             logger.warning("Failed to get worksheet save timestamp: %s", e)
+            failed = True
+
+        # Exponential backoff with full jitter; failures (often throttling) back off further
+        if failed:
+            error_attempt += 1
+            delay = base_delay * 2 ** error_attempt
+        else:
+            attempt += 1
+            delay = min(poll_interval, base_delay * 2 ** (attempt - 1))
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        delay = min(random.uniform(0, delay), remaining)
 
-        logger.debug("Waiting %s seconds before retrying...", poll_interval)
-        time.sleep(poll_interval)
+        logger.debug("Waiting %.2f seconds before retrying...", delay)
+        await asyncio.sleep(delay)
 
     logger.error("Timed out waiting for worksheet save after %s", start_time.isoformat())
-    return False
+    return None
+
+
+class NoteSubmissionError(Exception):
+    """A note submission failed; the message is safe to show to the user."""
 
+    def __init__(self, message, deal_id=None):
+        super().__init__(message)
+        self.deal_id = deal_id
 
-def excel_note_to_hubspot(request, signed_row):
+
+class TransientNoteError(NoteSubmissionError):
+    """
+    A note submission failed in a way a later retry may fix: the save wasn't seen yet,
+    a Graph read failed, or HubSpot answered with a 5xx/429.
+    """
+
+    def __init__(self, message, deal_id=None, note=None):
+        super().__init__(message, deal_id)
+        # The row contents already read, when only the HubSpot call is left to retry
+        self.note = note
+
+
+@transaction.non_atomic_requests
+async def excel_note_to_hubspot(request, signed_row):
     """
-    Process Excel note submission to HubSpot.
+    Accept an Excel note submission and queue it for HubSpot.
+
+    The save poll and the Graph and HubSpot calls run in the process_excel_note Celery task,
+    so the response returns right away instead of holding the connection while polling.
     Args:
         request: Django HTTP request object
         signed_row: Signed row number string
     Returns:
         HttpResponse: HTML response with auto-close script
     """
-    customer, feature = _get_customer_and_feature()
-    if not customer or not feature:
-        return _render_error_response("Customer or feature configuration not found")
+    # Reject malformed or tampered links before queuing any work
+    excel_row = _parse_row(signed_row)
+    if excel_row is None:
+        logger.error(f"Invalid or expired row link: {signed_row}")
+        return _render_error_response("Invalid or expired link")
+
+    submission_time = datetime.now(timezone.utc)
+
+    try:
+        result = await asyncio.to_thread(process_excel_note.delay, excel_row, submission_time.isoformat())
+    except Exception as e:
+        logger.error(f"Failed to queue Excel note for row {excel_row}: {e}")
+        return _render_error_response("An unexpected error occurred")
+
+    logger.info(f"Queued Excel note for row {excel_row} as task {result.id}")
+
+    deal_info = {
+        "row_id": excel_row,
+        "submitted": submission_time.isoformat(sep=" ", timespec="milliseconds"),
+    }
+    # The task ID finds the submission's outcome in the logs and the Celery result backend
+    return _render_success_response(deal_info, f"Note received, sending it to HubSpot... (reference {result.id})")
+
+
+async def submit_excel_note(excel_row, submission_time, customer, feature, note=None):
+    """
+    Send the note in an Excel row to HubSpot, then clear it from the sheet.
+
+    Args:
+        excel_row: Verified Excel row number
+        submission_time: When the user submitted the note; saves from shortly before count
+        customer: Customer whose Graph and HubSpot credentials are used
+        feature: The customer's feature holding the workbook and worksheet IDs
+        note: Row contents carried by a TransientNoteError from an earlier attempt whose HubSpot
+            call failed; the sheet isn't read again and HubSpot is checked for the note first
+    Returns:
+        dict or None: Deal details for the submitted note, or None if the row had no note
+    Raises:
+        TransientNoteError: If the save wasn't seen in time, a Graph read failed, or HubSpot failed with a 5xx/429
+        NoteSubmissionError: If the note could not be submitted for any other reason
+    """
+    logger.info(f"Processing Excel note to HubSpot for verified row {excel_row}")
 
     logger.info(f"Using customer: {customer.id}, feature: {feature.id}")
 
     try:
-        ms_client = MSGraphClient(customer)
+        ms_client = await _get_graph_client(customer)
     except Exception as e:
         logger.error(f"Failed to initialize MS Graph client: {e}")
-        return _render_error_response("Failed to connect to Microsoft Graph")
-
-    # # Verify the signature and extract the row number
-    # excel_row = ms_client._verify_signed_row(signed_row, settings.SECRET_KEY)
-    
-    # if excel_row is None:
-    #     logger.error(f"Invalid or expired signature: {signed_row}")
-    #     return _render_error_response("Invalid or expired link")
+        raise NoteSubmissionError("Failed to connect to Microsoft Graph") from e
 
-    # if excel_row < 1:
-    #     logger.error(f"Excel row must be positive: {excel_row}")
-    #     return _render_error_response("Row number must be positive")
+    retrying = note is not None
+    if not retrying:
+        note = await _read_submitted_note(ms_client, feature, excel_row, submission_time)
+        if note is None:
+            return None
 
-    # logger.info(f"Processing Excel note to HubSpot for verified row {excel_row}")
+    deal_id = note["deal_id"]
+    logger.info(f"Processing deal ID: {deal_id}")
 
-    
+    # Send note to HubSpot, stamped with the submission time so a retry can tell whether
+    # the failed attempt had created it anyway
     try:
-        current_time_stamp = datetime.now(timezone.utc)
+        success = await asyncio.to_thread(
+            _create_hubspot_note,
+            customer,
+            deal_id,
+            note["note"],
+            int(submission_time.timestamp() * 1000),
+            check_existing=retrying,
+        )
+    except HubSpotServerError as e:
+        raise TransientNoteError("Failed to create note in HubSpot", deal_id=deal_id, note=note) from e
+    if not success:
+        raise NoteSubmissionError("Failed to create note in HubSpot", deal_id=deal_id)
+
+    # Clear the "Submit a Note" cell after processing
+    await _clear_excel_cell(ms_client, feature, note["note_column"], excel_row)
+
+    logger.info(f"Successfully processed note for deal {deal_id}")
+    return {
+        "row_id": excel_row,
+        "deal_name": note["deal_name"],
+        "deal_id": deal_id,
+        "note": note["note"],
+        "last_saved": note["last_saved"],
+        "submitted": submission_time.isoformat(sep=" ", timespec="milliseconds"),
+    }
+
+
+async def _read_submitted_note(ms_client, feature, excel_row, submission_time):
+    """
+    Wait for the save that carries the submitted note, then read the note and its deal from the row.
 
-        # Wait for Excel save to finish after user click
-        sheet_ready = wait_for_sheet_save(
-            ms_client,
-            workbook_item_id=feature.workbook_id,
-            worksheet_name=feature.worksheet_name,
-            timeout=200,
-            poll_interval=5,
+    Returns:
+        dict or None: The note, deal ID and name, note column letter and save time, or None if the row had no note
+    Raises:
+        TransientNoteError: If the save wasn't seen in time or a Graph read failed
+        NoteSubmissionError: If the row has no deal ID
+    """
+    # Wait for Excel save to finish after user click. The header row doesn't depend
+    # on the save, so it is read (and cached on the client) while polling
+    try:
+        workbook_last_save_stamp, column_letters = await asyncio.gather(
+            wait_for_sheet_save(
+                ms_client,
+                workbook_item_id=feature.workbook_id,
+                worksheet_name=feature.worksheet_name,
+                timeout=6,
+                poll_interval=1,
+                since=submission_time,
+            ),
+            ms_client.get_header_letters(feature.workbook_id, feature.worksheet_id, _NOTE_HEADERS),
         )
+    except requests.exceptions.RequestException as e:
+        raise TransientNoteError("Failed to read the Excel sheet") from e
 
-        if not sheet_ready:
-            return _render_error_response("Excel sheet not saved in time. Please try again.")
+    if workbook_last_save_stamp is None:
+        raise TransientNoteError("Excel sheet not saved in time. Please try again.")
 
-        # Extract Excel row (signed_row is assumed safe, but normally should be verified)
-        excel_row = signed_row  # Replace with signature verification if needed
+    cell_values = await _read_note_row(ms_client, feature, excel_row)
 
-        logger.info(f"Processing Excel note to HubSpot for row: {excel_row}")
+    logger.debug(f"Workbook last saved timestamp: {workbook_last_save_stamp.isoformat()}")
 
-        # Get last save timestamp for logging/reporting
-        workbook_last_save_stamp = ms_client.get_worksheet_last_saved_timestamp(
+    logger.debug(f"Submission timestamp: {submission_time.isoformat()}")
+
+    # Read data from Excel
+    note_value = _cell_text(cell_values["Submit a Note"])
+    if not note_value:
+        # lastModifiedDateTime covers the whole workbook, so the save seen may have been another
+        # edit made just before the click. Wait briefly for a later save and read the row once more
+        logger.info(f"No note value found in row {excel_row}, checking again after the next save")
+        await wait_for_sheet_save(
+            ms_client,
             workbook_item_id=feature.workbook_id,
             worksheet_name=feature.worksheet_name,
+            timeout=3,
+            poll_interval=1,
+            tolerance=0,
+            since=workbook_last_save_stamp + timedelta(milliseconds=1),
         )
-        if isinstance(workbook_last_save_stamp, str):
-            workbook_last_save_stamp = parser.isoparse(workbook_last_save_stamp)
-
-        logger.debug(f"Workbook last saved timestamp: {workbook_last_save_stamp.isoformat()}")
-
-        # Ensure current timestamp is timezone-aware (should already be)
-        submission_time = current_time_stamp
-        if submission_time.tzinfo is None:
-            submission_time = submission_time.replace(tzinfo=timezone.utc)
-
-        logger.debug(f"Submission timestamp: {submission_time.isoformat()}")
-
-        # Read data from Excel
-        note_value = _get_excel_cell_value(ms_client, feature, excel_row, "Submit a Note")
+        cell_values = await _read_note_row(ms_client, feature, excel_row)
+        note_value = _cell_text(cell_values["Submit a Note"])
         if not note_value:
-            logger.info(f"No note value found in row {excel_row}")
-            return _render_success_response("No note to submit")
+            logger.warning(f"No note value found in row {excel_row} after re-checking; nothing submitted")
+            return None
 
-        logger.info(f"Retrieved note value from Excel (length: {len(note_value)})")
+    logger.info(f"Retrieved note value from Excel (length: {len(note_value)})")
 
-        deal_id = _get_excel_cell_value(ms_client, feature, excel_row, "Record ID")
-        deal_name = _get_excel_cell_value(ms_client, feature, excel_row, "Deal Name")
-        if not deal_id:
-            logger.warning(f"No deal ID found in row {excel_row}")
-            return _render_error_response("Deal ID not found in Excel row")
+    deal_id = _cell_text(cell_values["Record ID"])
+    if not deal_id:
+        logger.warning(f"No deal ID found in row {excel_row}")
+        raise NoteSubmissionError("Deal ID not found in Excel row")
 
-        logger.info(f"Processing deal ID: {deal_id}")
+    # Plain values only: a retry receives this through the Celery message
+    return {
+        "deal_id": deal_id,
+        "deal_name": _cell_text(cell_values["Deal Name"]),
+        "note": note_value,
+        "note_column": column_letters["Submit a Note"],
+        "last_saved": workbook_last_save_stamp.isoformat(sep=" ", timespec="milliseconds"),
+    }
 
-        # Send note to HubSpot
-        success = _create_hubspot_note(customer, deal_id, note_value)
-        if not success:
-            return _render_error_response("Failed to create note in HubSpot")
 
-        # Clear the "Submit a Note" cell after processing
-        _clear_excel_cell(ms_client, feature, excel_row)
+def _parse_row(signed_row):
+    """
+    Extract the Excel row number from a row link.
 
-        deal_info = {
-            "row_id": excel_row,
-            "deal_name": deal_name,
-            "deal_id": deal_id,
-            "note": note_value,
-            "last_saved": workbook_last_save_stamp.strftime("%Y-%m-%d %H:%M:%S.") + f"{int(workbook_last_save_stamp.microsecond / 1000):03d}",
-            "submitted": submission_time.strftime("%Y-%m-%d %H:%M:%S.") + f"{int(submission_time.microsecond / 1000):03d}",
-        }
+    Accepts a value signed with _SIGNER, or, while EXCEL_ALLOW_UNSIGNED_ROWS is on, a plain
+    row number as written by the sheet's existing HYPERLINK formulas.
 
-        logger.info(f"Successfully processed note for deal {deal_id}")
-        return _render_success_response(deal_info, "Note submitted successfully")
+    Returns:
+        int or None: The row number, or None if the link is invalid, expired or out of range
+    """
+    if "." in signed_row:
+        try:
+            signed_row = _SIGNER.unsign(signed_row, max_age=SIGNATURE_MAX_AGE).decode()
+        except (BadSignature, SignatureExpired):
+            return None
+    elif not getattr(settings, "EXCEL_ALLOW_UNSIGNED_ROWS", True):
+        return None
 
-    except Exception as e:
-        logger.error(f"Unexpected error in excel_note_to_hubspot: {e}", exc_info=True)
-        return _render_error_response("An unexpected error occurred")
-    
-    
+    if not signed_row.isdecimal():
+        return None
 
-def _get_signer():
-    """Return a TimestampSigner with project-level secret."""
-    secret = getattr(settings, "EXCEL_SIGNATURE_SECRET", settings.SECRET_KEY)
-    return TimestampSigner(secret)
+    row = int(signed_row)
+    return row if 1 <= row <= _MAX_EXCEL_ROWS else None
 
 
 def _get_customer_and_feature():
+    """Return the configured customer and feature, reusing them for _CUSTOMER_FEATURE_TTL seconds."""
+    global _customer_feature_cache
+
+    cached = _customer_feature_cache
+    if cached and cached[0] > time.monotonic():
+        return cached[1], cached[2]
+
+    customer, feature = _load_customer_and_feature()
+    # Credential edits made in another process only show up here, so rebuild the clients too
+    _graph_clients.clear()
+    _hubspot_clients.clear()
+    if feature:
+        _customer_feature_cache = (time.monotonic() + _CUSTOMER_FEATURE_TTL, customer, feature)
+    return customer, feature
+
+
+def clear_customer_caches():
+    """Drop the cached customer, feature and clients so the next request rebuilds them."""
+    global _customer_feature_cache
+    _customer_feature_cache = None
+    _graph_clients.clear()
+    _hubspot_clients.clear()
+
+
+async def _get_graph_client(customer):
+    """Return the customer's shared Graph client, building it on first use."""
+    ms_client = _graph_clients.get(customer.id)
+    if ms_client is None:
+        ms_client = await AsyncMSGraphClient.from_customer(customer)
+        # A shared client outlives one submission, so pick up column changes made in Excel sooner
+        ms_client.client.header_row_ttl = 300
+        _graph_clients[customer.id] = ms_client
+    return ms_client
+
+
+def _load_customer_and_feature():
     try:
-        customer = Customer.objects.first()
-        if not customer:
-            logger.error("No customer found in database")
-            return None, None
-
-        feature = customer.features.first()
+        # One query for the first customer's first configured feature and the customer columns the clients need
+        feature = (
+            CustomerFeature.objects.select_related("customer")
+            .exclude(workbook_id="")
+            .exclude(worksheet_id="")
+            .only(*_CUSTOMER_FEATURE_FIELDS)
+            .order_by("customer_id", "id")
+            .first()
+        )
         if not feature:
-            logger.error(f"No features found for customer {customer.id}")
+            logger.error("No customer feature with workbook/worksheet IDs found in database")
             return None, None
 
-        if not all([feature.workbook_id, feature.worksheet_id]):
-            logger.error(f"Feature {feature.id} missing required workbook/worksheet IDs")
-            return None, None
-
-        return customer, feature
+        return feature.customer, feature
 
     except ObjectDoesNotExist as e:
         logger.error(f"Database error retrieving customer/feature: {str(e)}")
@@ -223,34 +482,53 @@ def _get_customer_and_feature():
         return None, None
 
 
-def _get_excel_cell_value(ms_client, feature, row_number, header_name):
+async def _read_note_row(ms_client, feature, excel_row):
+    """
+    Read the note and the deal fields of a row in one range request.
+
+    Raises:
+        TransientNoteError: If Graph fails the read, so it isn't mistaken for an empty note
+    """
     try:
-        value = ms_client.get_cell_value_by_header(
+        return await ms_client.get_cell_values_by_headers(
             workbook_item_id=feature.workbook_id,
             worksheet_id=feature.worksheet_id,
-            row_number=row_number,
-            header_name=header_name,
+            row_number=excel_row,
+            header_names=_NOTE_HEADERS,
+            raise_errors=True,
         )
-        if value:
-            return str(value).strip() or None
-        return None
+    except requests.exceptions.RequestException as e:
+        raise TransientNoteError("Failed to read the Excel row") from e
 
-    except Exception as e:
-        logger.error(
-            f"Error retrieving Excel cell value (row: {row_number}, "
-            f"header: {header_name}): {str(e)}"
-        )
-        return None
+
+def _cell_text(value):
+    """Return a cell value as stripped text, or None if it is empty."""
+    if value:
+        return str(value).strip() or None
+    return None
 
 
-def _create_hubspot_note(customer, deal_id, note_value):
+def _create_hubspot_note(customer, deal_id, note_value, timestamp, check_existing=False):
+    """
+    Create the note on the deal; HubSpotServerError is left to the caller to retry.
+
+    With check_existing, a note already on the deal with the same hs_timestamp counts as created:
+    HubSpot may have stored it before answering an earlier attempt with an error.
+    """
     try:
         if not customer.hubspot_secret_app_key:
             logger.error(f"Customer {customer.id} missing HubSpot API key")
             return False
 
-        hs_client = HubSpotClient(customer.hubspot_secret_app_key)
-        created_note = hs_client.create_note_on_deal(deal_id, note_value)
+        hs_client = _hubspot_clients.get(customer.id)
+        if hs_client is None:
+            hs_client = _hubspot_clients[customer.id] = HubSpotClient(customer.hubspot_secret_app_key)
+        if check_existing and hs_client.find_note_on_deal(deal_id, timestamp, raise_server_errors=True):
+            logger.info(f"HubSpot note for deal {deal_id} was already created by an earlier attempt")
+            return True
+        created_note = hs_client.create_note_on_deal(
+            deal_id, note_value, raise_server_errors=True, timestamp=timestamp,
+        )
 
         if created_note:
             logger.info(f"Successfully created HubSpot note for deal {deal_id}")
@@ -259,15 +537,18 @@ def _create_hubspot_note(customer, deal_id, note_value):
             logger.error(f"Failed to create HubSpot note for deal {deal_id}")
             return False
 
+    except HubSpotServerError:
+        raise
     except Exception as e:
         logger.error(f"Error creating HubSpot note for deal {deal_id}: {str(e)}")
         return False
 
 
-def _clear_excel_cell(ms_client, feature, excel_row):
+async def _clear_excel_cell(ms_client, feature, column_letter, excel_row):
+    # The note was read from this column, so it can't be missing here
+    cell_address = f"{column_letter}{excel_row}"
     try:
-        cell_address = f"J{excel_row}"
-        cell_update = ms_client.update_cell(
+        cell_update = await ms_client.update_cell(
             feature.workbook_id,
             feature.worksheet_id,
             cell_address,
@@ -279,7 +560,7 @@ def _clear_excel_cell(ms_client, feature, excel_row):
             logger.warning(f"Failed to clear Excel cell {cell_address}")
 
     except Exception as e:
-        logger.error(f"Error clearing Excel cell J{excel_row}: {str(e)}")
+        logger.error(f"Error clearing Excel cell {cell_address}: {str(e)}")
 
 
 def _render_success_response(deal_info, message="Operation completed successfully"):
@@ -287,41 +568,15 @@ def _render_success_response(deal_info, message="Operation completed successfull
     Render success response with auto-close script.
     
     Args:
+        deal_info: Deal details to display, or None
         message: Success message to display
         
     Returns:
         HttpResponse: HTML response
     """
-    template_content = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Success</title>
-            <meta charset="utf-8">
-        </head>
-        <body>
-            <div style="font-family: Arial, sans-serif; text-align: center; padding: 20px;">
-            <h2 style="color: green;">✓ Success</h2>
-            <p>{{ message }}</p>
-            <br>
-            <p><strong>Row ID</strong> {{ deal_info.row_id|default:"" }}<br>
-            <strong>Deal ID</strong> {{ deal_info.deal_id|default:"" }}<br>
-            <strong>Deal Name</strong> {{ deal_info.deal_name|default:"" }}<br>
-            <strong>Note</strong> {{ deal_info.note|default:"" }}<br>
-            <strong>Workbook Last Saved Timestamp</strong> {{deal_info.last_saved}}<br>
-            <strong>Submission happened at</strong> {{deal_info.submitted}}</p>
-            <br>
-            <p><small>This window will close automatically...</small></p>
-            </div>
-            
-        </body>
-        </html>
-        """
-    
-    
-    template = Template(template_content)
-    context = Context({'deal_info': deal_info or {}, 'message': message})
-    return HttpResponse(template.render(context))
+    deal_info = deal_info or {}
+    fields = {field: escape(str(deal_info.get(field) or "")) for field in _DEAL_INFO_FIELDS}
+    return HttpResponse(_SUCCESS_HTML.format(message=escape(str(message)), **fields))
 
 
 def _render_error_response(error_message="An error occurred"):
@@ -334,33 +589,10 @@ def _render_error_response(error_message="An error occurred"):
     Returns:
         HttpResponse: HTML response
     """
-    template_content = """
-    <!DOCTYPE html>
-    <html>
-      <head>
-        <title>Error</title>
-        <meta charset="utf-8">
-      </head>
-      <body>
-        <div style="font-family: Arial, sans-serif; text-align: center; padding: 20px;">
-          <h2 style="color: red;">✗ Error</h2>
-          <p>{{ error_message }}</p>
-          <p><small>This window will close automatically...</small></p>
-        </div>
-        <script>
-          setTimeout(() => {
-            try {
-              window.close();
-            } catch (e) {
-              // Fallback if window.close() is blocked
-              document.body.innerHTML = '<div style="text-align: center; padding: 20px;"><h3>Please close this window</h3></div>';
-            }
-          }, 3000);
-        </script>
-      </body>
-    </html>
-    """
-    
-    template = Template(template_content)
-    context = Context({'error_message': error_message})
-    return HttpResponse(template.render(context))
\ No newline at end of file
+    return HttpResponse(_error_html(error_message))
+
+
+@lru_cache(maxsize=32)
+def _error_html(error_message):
+    """Error pages only ever carry a handful of fixed messages, so each is rendered once."""
+    return _ERROR_HTML.format(error_message=escape(str(error_message)))
@@ -9,10 +9,12 @@ logger = logging.getLogger(__name__)
 User = get_user_model()
 
 @receiver(post_save, sender=User)
-def setup_new_user(instance, created, **kwargs):
-    if created:
-        if not hasattr(instance, "dashboard"):
-            Dashboard.objects.create(user=instance)
-            logger.info(f"Dashboard created for new user {instance.email}")
-        else:
-            logger.warning(f"Dashboard already exists for user {instance.email} (unexpected)")
+def setup_new_user(instance, created, raw=False, **kwargs):
+    # Fixture loads (raw saves) bring their own dashboards
+    if raw or not created:
+        return
+    _, dashboard_created = Dashboard.objects.get_or_create(user=instance)
+    if dashboard_created:
+        logger.info(f"Dashboard created for new user {instance.email}")
+    else:
+        logger.warning(f"Dashboard already exists for user {instance.email} (unexpected)")
@@ -0,0 +1,28 @@
+import pytest
+from django.db.models.signals import post_save
+
+from app.dashboard.models import Dashboard
+from app.users.models import User
+from app.users.tests.factories import UserFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_new_user_gets_a_dashboard():
+    user = UserFactory()
+
+    assert Dashboard.objects.filter(user=user).count() == 1
+
+
+def test_repeated_created_signal_keeps_one_dashboard(user: User):
+    post_save.send(sender=User, instance=user, created=True, raw=False)
+
+    assert Dashboard.objects.filter(user=user).count() == 1
+
+
+def test_raw_save_skips_dashboard(user: User):
+    Dashboard.objects.filter(user=user).delete()
+
+    post_save.send(sender=User, instance=user, created=True, raw=True)
+
+    assert not Dashboard.objects.filter(user=user).exists()
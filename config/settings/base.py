@@ -382,3 +382,5 @@ CHANNEL_LAYERS = {
 
 SECRET_KEY = env("SECRET_KEY", default="")
 EXCEL_SIGNATURE_SECRET = env("EXCEL_SIGNATURE_SECRET", default=SECRET_KEY)
+# Accept plain (unsigned) row numbers in Excel note links; turn off once the sheet's links are signed
+EXCEL_ALLOW_UNSIGNED_ROWS = env.bool("EXCEL_ALLOW_UNSIGNED_ROWS", default=True)